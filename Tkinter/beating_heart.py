@@ -1,175 +1,303 @@
-import random
-from math import sin, cos, pi, log, sqrt
+import argparse
+import asyncio
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from tkinter import *
 
-# Canvas config
-CANVAS_WIDTH = 640
-CANVAS_HEIGHT = 600
-CANVAS_CENTER_X = CANVAS_WIDTH // 2
-CANVAS_CENTER_Y = CANVAS_HEIGHT // 2
-
-IMAGE_ENLARGEMENT = 11
-HEART_COLOR = "#ff2121"
-
-def heart_function(t, shrink_ratio=IMAGE_ENLARGEMENT):
-    x = 16 * sin(t)**3
-    y = 13 * cos(t) - 5 * cos(2 * t) - 2 * cos(3 * t) - cos(4 * t)
-    x *= shrink_ratio
-    y *= shrink_ratio
-    return int(x + CANVAS_CENTER_X), int(-y + CANVAS_CENTER_Y)
-
-def scatter_inside(x, y, beta=0.15):
-    ratio_x = beta * log(random.random())
-    ratio_y = beta * log(random.random())
-    dx = ratio_x * (x - CANVAS_CENTER_X)
-    dy = ratio_y * (y - CANVAS_CENTER_Y)
-    return x - dx, y - dy
-
-def shrink(x, y, ratio):
-    force = -1 / (((x - CANVAS_CENTER_X)**2 + (y - CANVAS_CENTER_Y)**2)**0.6)
-    dx = ratio * force * (x - CANVAS_CENTER_X)
-    dy = ratio * force * (y - CANVAS_CENTER_Y)
-    return x - dx, y - dy
-
-def curve(p):
-    return 2 * (2 * sin(4 * p)) / (2 * pi)
-
-def distance_from_center(x, y):
-    return sqrt((x - CANVAS_CENTER_X) ** 2 + (y - CANVAS_CENTER_Y) ** 2)
-
-class Heart:
-    def __init__(self, generate_frame=20):
-        self.points = set()
-        self.center_diffusion_points = set()
-        self.inner_scattered_points = set()
-        self.all_points = {}
-        self.generate_frame = generate_frame
-        self.build(2000)
-
-        for frame in range(generate_frame):
-            self.calc(frame)
-
-    def build(self, number):
-        # Outer edge points
-        for _ in range(number):
-            t = random.uniform(0, 2 * pi)
-            x, y = heart_function(t)
-            self.points.add((x, y))
-
-        # Add scattered edge points
-        for _x, _y in list(self.points):
-            for _ in range(3):
-                x, y = scatter_inside(_x, _y, 0.05)
-                self.points.add((x, y))
-
-        # Center diffusion points
-        point_list = list(self.points)
-        for _ in range(4000):
-            x, y = random.choice(point_list)
-            x, y = scatter_inside(x, y, 0.17)
-            self.center_diffusion_points.add((x, y))
-
-        # Inner scattered points with distance-based density
-        self.inner_scatter_points()  # Call the updated function to fill the inner space
-
-        # Extra scattered inner particles with density based on distance
-        for _ in range(3500):
-            t = random.uniform(0, 2 * pi)
-            base_x, base_y = heart_function(t, shrink_ratio=random.uniform(7, 10.5))
-            base_x += random.randint(-8, 8)
-            base_y += random.randint(-8, 8)
-
-            # Decrease particle density as we move closer to the center
-            distance = distance_from_center(base_x, base_y)
-            density_factor = 1 / (1 + distance / 100)
-
-            # Randomize density based on distance
-            if random.random() < density_factor:
-                self.inner_scattered_points.add((base_x, base_y))
-
-    def inner_scatter_points(self):
-        """Generate particles to fill the inner space of the heart and ensure it reaches the center."""
-        for _ in range(30000):  # Increase the number of particles to cover all space
-            t = random.uniform(0, 2 * pi)
-            base_x, base_y = heart_function(t, shrink_ratio=random.uniform(7, 10.5))
-
-            # Add small random variation to ensure a better distribution of particles
-            base_x += random.randint(-8, 8)
-            base_y += random.randint(-8, 8)
-
-            # Calculate the distance from the center
-            distance = distance_from_center(base_x, base_y)
-
-            # Adjust the density factor to allow more particles to reach the center
-            # Ensure the factor is gradual and does not cut off near the center
-            density_factor = 1 / (1 + (distance ** 2) / 40)  # Smooth gradient to allow more particles closer to center
-
-            # Randomize and let particles fill from outer to inner part
-            if random.random() < density_factor:
-                self.inner_scattered_points.add((base_x, base_y))
-
-
-
-    def calc_position(self, x, y, ratio):
-        force = 1 / (((x - CANVAS_CENTER_X) ** 2 + (y - CANVAS_CENTER_Y) ** 2) ** 0.520)
-        dx = ratio * force * (x - CANVAS_CENTER_X) + random.randint(-1, 1)
-        dy = ratio * force * (y - CANVAS_CENTER_Y) + random.randint(-1, 1)
-        return x - dx, y - dy
-
-    def calc(self, generate_frame):
-        ratio = 10 * curve(generate_frame / 10 * pi)
-        halo_radius = int(4 + 6 * (1 + curve(generate_frame / 10 * pi)))
-        halo_number = int(3000 + 4000 * abs(curve(generate_frame / 10 * pi) ** 2))
-
-        all_points = []
-        heart_halo_point = set()
-
-        # Halo glow
-        for _ in range(halo_number):
-            t = random.uniform(0, 2 * pi)
-            x, y = heart_function(t, shrink_ratio=11.6)
-            x, y = shrink(x, y, halo_radius)
-            if (x, y) not in heart_halo_point:
-                heart_halo_point.add((x, y))
-                x += random.randint(-14, 14)
-                y += random.randint(-14, 14)
-                size = random.choice((1, 2, 3))
-                all_points.append((x, y, size))
-
-        # Main edge
-        for x, y in self.points:
-            x, y = self.calc_position(x, y, ratio)
-            size = random.randint(1, 3)
-            all_points.append((x, y, size))
-
-        # Center particles
-        for x, y in self.center_diffusion_points:
-            x, y = self.calc_position(x, y, ratio)
-            size = random.randint(1, 2)
-            all_points.append((x, y, size))
-
-        # Scattered inner particles with distance-based density
-        for x, y in self.inner_scattered_points:
-            x, y = self.calc_position(x, y, ratio)
-            size = random.choice((1, 2))
-            all_points.append((x, y, size))
-
-        self.all_points[generate_frame] = all_points
+# The shared heart package lives at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from heart import core
+from heart.component import HeartComponent
+from heart.core import CANVAS_HEIGHT, CANVAS_WIDTH, DEFAULT_SEED, rasterize_rgb
+from heart.glow import rasterize_glow
+from heart.lod import AdaptiveDetail
+from heart.scene import Scene
+from heart.solid import SPIN_PERIOD, SolidHeart
+from heart.tempo import DEFAULT_BPM, BeatClock, open_bpm_source
+from heart.timing import StageTimer
+
+HEART_COLOR = "#%02x%02x%02x" % core.HEART_COLOR
+# ms between frames; the shared core spends 10 frames per beat, so this keeps the 0.8 s beat
+FRAME_DELAY = 80
+# With a live BPM the beat phase follows the wall clock, so the canvas can refresh faster
+LIVE_FRAME_DELAY = 20
+
+# "items" creates one canvas rectangle per particle every frame, "image" rasterizes
+# each frame once into a PhotoImage and swaps a single image item per tick, and
+# "glow" does the same with the frame's summed, tone-mapped light, which needs numpy
+RENDER_MODES = ("items", "image") + (("glow",) if core.np is not None else ())
+# Modes that show a whole frame as one cached PhotoImage
+IMAGE_MODES = ("image", "glow")
+
+def rasterize_ppm(columns, viewport=None, glow=False):
+    """Paint a frame onto a black binary PPM, which PhotoImage reads natively."""
+    viewport = viewport or core.Viewport()
+    rgb = rasterize_glow(columns, viewport) if glow else rasterize_rgb(columns, viewport)
+    return f"P6 {viewport.width} {viewport.height} 255\n".encode() + rgb
+
+class Heart(core.Heart):
+    """Tkinter back end: draws the shared simulation's frames onto a Canvas."""
+
+    def __init__(self, *args, render_mode="image", target_fps=None, **kwargs):
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"unknown render mode {render_mode!r}, expected one of {RENDER_MODES}")
+        self.render_mode = render_mode
+        # Only the per-particle items mode scales with particle count, so only it adapts
+        self.detail = AdaptiveDetail(target_fps) if target_fps else None
+        self.frame_images = {}
+        self.live_image = None
+        super().__init__(*args, **kwargs)
+        self.viewport = core.Viewport(CANVAS_WIDTH, CANVAS_HEIGHT, self.density)
+
+    def resize(self, width, height):
+        """Draw the same frames at a new canvas size; only the cached images are redone."""
+        if (width, height) != (self.viewport.width, self.viewport.height):
+            self.viewport = core.Viewport(width, height, self.density)
+            self.frame_images.clear()
+
+    def frame_image(self, frame):
+        """Rasterize a frame into a PhotoImage once per image mode and keep it for every later beat."""
+        key = (self.render_mode, frame)
+        image = self.frame_images.get(key)
+        if image is None:
+            ppm = rasterize_ppm(self.all_points.columns(frame), self.viewport, glow=self.render_mode == "glow")
+            image = self.frame_images[key] = PhotoImage(data=ppm, format="PPM")
+            self.charge_frame(frame, len(ppm))
+        return image
+
+    def forget_frame(self, frame):
+        for mode in IMAGE_MODES:
+            self.frame_images.pop((mode, frame), None)
 
     def render(self, render_canvas, render_frame):
-        for x, y, size in self.all_points[render_frame % self.generate_frame]:
+        frame = self.ensure_frame(render_frame % self.generate_frame)
+        if self.render_mode in IMAGE_MODES:
+            self.show_image(render_canvas, self.frame_image(frame))
+            return
+
+        self.draw_detailed(lambda columns: self.draw_items(render_canvas, columns), frame=frame)
+
+    def render_at(self, render_canvas, position):
+        """Draw the cycle at a fractional frame; a live tempo seldom repeats one, so nothing is cached."""
+        if self.render_mode in IMAGE_MODES:
+            ppm = rasterize_ppm(self.columns_at(position), self.viewport, glow=self.render_mode == "glow")
+            self.live_image = PhotoImage(data=ppm, format="PPM")
+            self.show_image(render_canvas, self.live_image)
+            return
+
+        self.draw_detailed(lambda columns: self.draw_items(render_canvas, columns), position=position)
+
+    def show_image(self, render_canvas, image):
+        item = render_canvas.find_withtag("heart")
+        if item:
+            render_canvas.itemconfigure(item[0], image=image)
+        else:
+            render_canvas.create_image(0, 0, anchor=NW, image=image, tags="heart")
+
+    def draw_items(self, render_canvas, columns):
+        for x, y, size in self.viewport.points(columns):
             render_canvas.create_rectangle(x, y, x + size, y + size, width=0, fill=HEART_COLOR)
 
-def draw(main: Tk, render_canvas: Canvas, render_heart: Heart, render_frame=0):
+class FrameStats:
+    """Frame intervals for a timer, shown as a text overlay refreshed every `refresh` ticks."""
+
+    def __init__(self, timer: StageTimer, overlay=False, refresh=15):
+        self.timer = timer
+        self.overlay = overlay
+        self.refresh = refresh
+        self.ticks = 0
+        self.last = time.perf_counter()
+        self.text = ""
+
+    def tick(self, render_canvas: Canvas):
+        now = time.perf_counter()
+        self.timer.record("frame", now - self.last)
+        self.last = now
+        if not self.overlay:
+            return
+        if self.ticks % self.refresh == 0:
+            self.text = "\n".join(self.timer.summary())
+        self.ticks += 1
+        # Clearing the items mode canvas takes the overlay with it
+        if not render_canvas.find_withtag("stats"):
+            render_canvas.create_text(8, 8, anchor=NW, fill="white", font=("Courier", 10), tags="stats")
+        render_canvas.itemconfigure("stats", text=self.text)
+        render_canvas.tag_raise("stats")
+
+# Stages of an untimed loop go through a disabled timer, which does nothing
+NO_TIMER = StageTimer()
+
+class BuildingHeart:
+    """Stands in for the heart while a HeartComponent builds it on another thread.
+
+    Each tick asks for the densest heart that has the frames it needs, brought to
+    the canvas size and render mode, and shows the build progress in the title.
+    """
+
+    def __init__(self, component: HeartComponent):
+        self.component = component
+        self.size = (CANVAS_WIDTH, CANVAS_HEIGHT)
+        self.render_mode = "image"
+        self.shown = None
+
+    def heart_for(self, render_canvas: Canvas, *frames):
+        progress = (self.component.done, self.component.total)
+        if progress != self.shown:
+            self.shown = progress
+            title = "Beating Heart" if self.component.ready else "Beating Heart (building %d/%d)" % progress
+            render_canvas.winfo_toplevel().title(title)
+        heart = self.component.heart_for(*frames)
+        if heart is not None:
+            heart.resize(*self.size)
+            heart.render_mode = self.render_mode
+        return heart
+
+    def frames_at(self, position):
+        """The frame at a fractional position and the next, which a live tempo blends it with."""
+        frame = math.floor(position) % self.component.generate_frame
+        return frame, (frame + 1) % self.component.generate_frame
+
+def clear(render_canvas: Canvas, render_heart: Heart):
+    # The image mode reuses one canvas item, only per-particle items need clearing
+    if render_heart.render_mode == "items":
+        render_canvas.delete("all")
+
+def draw(main: Tk, render_canvas: Canvas, hearts: BuildingHeart, render_frame=0, delay=FRAME_DELAY,
+         stats: FrameStats = None):
+    timer = stats.timer if stats else NO_TIMER
+    frame = render_frame % hearts.component.generate_frame
+    render_heart = hearts.heart_for(render_canvas, frame)
+    if render_heart is not None:
+        with timer.stage("clear"):
+            clear(render_canvas, render_heart)
+        with timer.stage("render"):
+            render_heart.render(render_canvas, frame)
+    if stats:
+        stats.tick(render_canvas)
+    main.after(delay, draw, main, render_canvas, hearts, render_frame + 1, delay, stats)
+
+def draw_live(main: Tk, render_canvas: Canvas, hearts: BuildingHeart, beat_clock: BeatClock,
+              delay=LIVE_FRAME_DELAY, stats: FrameStats = None):
+    timer = stats.timer if stats else NO_TIMER
+    # Each tick draws wherever the beat clock has got to, however late the tick fired
+    position = beat_clock.position(hearts.component)
+    render_heart = hearts.heart_for(render_canvas, *hearts.frames_at(position))
+    if render_heart is not None:
+        with timer.stage("clear"):
+            clear(render_canvas, render_heart)
+        with timer.stage("render"):
+            render_heart.render_at(render_canvas, position)
+    if stats:
+        stats.tick(render_canvas)
+    main.after(delay, draw_live, main, render_canvas, hearts, beat_clock, delay, stats)
+
+def draw_scene(main: Tk, render_canvas: Canvas, hearts: BuildingHeart, scene: Scene, beat_clock: BeatClock = None,
+               render_frame=0, delay=FRAME_DELAY, stats: FrameStats = None):
+    # Every heart is painted into one image, so the canvas only ever swaps a single item
+    timer = stats.timer if stats else NO_TIMER
+    position = render_frame if beat_clock is None else beat_clock.position(hearts.component)
+    render_heart = hearts.heart_for(render_canvas, *range(hearts.component.generate_frame))
+    if render_heart is not None:
+        scene.use(render_heart)
+        with timer.stage("render"):
+            rgb = scene.glow_rgb(position) if render_heart.render_mode == "glow" else scene.rgb(position)
+            ppm = f"P6 {scene.width} {scene.height} 255\n".encode() + rgb
+            render_heart.live_image = PhotoImage(data=ppm, format="PPM")
+            render_heart.show_image(render_canvas, render_heart.live_image)
+    if stats:
+        stats.tick(render_canvas)
+    main.after(delay, draw_scene, main, render_canvas, hearts, scene, beat_clock, render_frame + 1, delay, stats)
+
+def draw_solid(main: Tk, render_canvas: Canvas, hearts: BuildingHeart, build: Future, beat_clock: BeatClock = None,
+               started=None, delay=LIVE_FRAME_DELAY, stats: FrameStats = None):
+    # The 3D heart is projected afresh every tick, turning once every SPIN_PERIOD seconds
+    if not build.done():
+        # Its particles are still being sampled on the build thread; the canvas stays black until then
+        main.after(delay, draw_solid, main, render_canvas, hearts, build, beat_clock, started, delay, stats)
+        return
+    solid = build.result()
+    timer = stats.timer if stats else NO_TIMER
+    now = time.perf_counter()
+    started = now if started is None else started
+    elapsed = now - started
+    beats = beat_clock.tick() if beat_clock is not None else elapsed * DEFAULT_BPM / 60
+    with timer.stage("render"):
+        viewport = core.Viewport(*hearts.size)
+        rgb = solid.rgb(viewport, 2 * math.pi * elapsed / SPIN_PERIOD, beats, glow=hearts.render_mode == "glow")
+        ppm = f"P6 {viewport.width} {viewport.height} 255\n".encode() + rgb
+        solid.live_image = PhotoImage(data=ppm, format="PPM")
+        item = render_canvas.find_withtag("heart")
+        if item:
+            render_canvas.itemconfigure(item[0], image=solid.live_image)
+        else:
+            render_canvas.create_image(0, 0, anchor=NW, image=solid.live_image, tags="heart")
+    if stats:
+        stats.tick(render_canvas)
+    main.after(delay, draw_solid, main, render_canvas, hearts, build, beat_clock, started, delay, stats)
+
+def resize(hearts: BuildingHeart, scene: Scene, count, width, height):
+    hearts.size = (width, height)
+    if scene is not None and (width, height) != (scene.width, scene.height):
+        scene.resize(width, height)
+        scene.tile(count)
+
+def toggle_render_mode(render_canvas: Canvas, hearts: BuildingHeart):
     render_canvas.delete("all")
-    render_heart.render(render_canvas, render_frame)
-    main.after(160, draw, main, render_canvas, render_heart, render_frame + 1)
+    hearts.render_mode = RENDER_MODES[(RENDER_MODES.index(hearts.render_mode) + 1) % len(RENDER_MODES)]
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Beating heart in a Tkinter window.")
+    parser.add_argument("--bpm", metavar="SOURCE",
+                        help="follow a live heart rate read from '-' (stdin), udp:PORT or a file")
+    parser.add_argument("--mode", choices=RENDER_MODES, default="image", help="render mode to start in (m cycles)")
+    parser.add_argument("--hearts", type=int, metavar="N", help="tile the canvas with N hearts beating out of step")
+    parser.add_argument("--3d", dest="solid", action="store_true",
+                        help="draw a rotating 3D particle heart; glow mode lights it, the other modes paint it")
+    parser.add_argument("--stats", action="store_true", help="overlay per-stage p50/p99 frame timings")
+    parser.add_argument("--trace", metavar="FILE", help="write a Chrome trace of every stage to FILE on exit")
+    args = parser.parse_args()
+
     root = Tk()
     root.title("Beating Heart")
     canvas = Canvas(root, width=CANVAS_WIDTH, height=CANVAS_HEIGHT, bg="black")
-    canvas.pack()
-    heart = Heart(generate_frame=20)
-    draw(root, canvas, heart)
+    canvas.pack(fill=BOTH, expand=True)
+    delay = LIVE_FRAME_DELAY if args.bpm or args.solid else FRAME_DELAY
+    # The heart builds on its own thread, so the window opens at once and beats sparse previews meanwhile
+    component = HeartComponent(Heart, generate_frame=20, seed=DEFAULT_SEED, cache=True, target_fps=1000 / delay)
+    if args.solid:
+        # The 3D heart has no frames, only particles to sample, but that still takes a moment
+        builder = ThreadPoolExecutor(1, thread_name_prefix="heart-build")
+        solid_build = builder.submit(SolidHeart)
+        builder.shutdown(wait=False)
+    else:
+        threading.Thread(target=asyncio.run, args=(component.start(),), name="heart-build", daemon=True).start()
+    hearts = BuildingHeart(component)
+    hearts.render_mode = args.mode
+    root.bind("<m>", lambda event: toggle_render_mode(canvas, hearts))
+    scene = None
+    if args.hearts:
+        scene = Scene(None, CANVAS_WIDTH, CANVAS_HEIGHT)
+        scene.tile(args.hearts)
+    canvas.bind("<Configure>", lambda event: resize(hearts, scene, args.hearts, event.width, event.height))
+    stats = None
+    if args.stats or args.trace:
+        stats = FrameStats(StageTimer(enabled=args.stats, trace=args.trace is not None), overlay=args.stats)
+    beat_clock = None
+    if args.bpm:
+        beat_clock = BeatClock()
+        open_bpm_source(args.bpm, beat_clock)
+    if args.solid:
+        draw_solid(root, canvas, hearts, solid_build, beat_clock, stats=stats)
+    elif scene is not None:
+        draw_scene(root, canvas, hearts, scene, beat_clock, delay=delay, stats=stats)
+    elif beat_clock is not None:
+        draw_live(root, canvas, hearts, beat_clock, stats=stats)
+    else:
+        draw(root, canvas, hearts, stats=stats)
     root.mainloop()
+    if args.trace:
+        stats.timer.dump(args.trace)
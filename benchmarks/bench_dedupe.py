@@ -0,0 +1,134 @@
+"""Benchmark of set-based against occupancy-grid deduplication of integer points.
+
+Feeds both paths the candidate streams the heart dedupes: the inner layer's
+build candidates (before its distance filter, so a worst case) and one frame's
+halo candidates at its busiest, deduplicated on a grid reused from frame to
+frame as the heart does. Reports the time per stream and the peak memory
+traced while deduplicating, for the Python engine (a set of tuples against
+OccupancyGrid) and the numpy engine (np.unique against unique_points_np), and
+checks both keep the same points.
+
+    python benchmarks/bench_dedupe.py --densities 1 4 --output dedupe.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.append(ROOT)
+from heart import core
+
+
+def candidates(number, low, high, jitter, grid):
+    """Integer grid-unit points drawn the way the heart draws a layer before deduplicating."""
+    table_x, table_y = core.heart_table()
+    rows = len(table_x)
+    xs, ys = [], []
+    for _ in range(number):
+        index = int(random.random() * rows)
+        shrink_ratio = random.uniform(low, high) * grid
+        xs.append(int(table_x[index] * shrink_ratio) + round(random.randint(-jitter, jitter) * grid))
+        ys.append(int(table_y[index] * shrink_ratio) + round(random.randint(-jitter, jitter) * grid))
+    return xs, ys
+
+
+def dedupe_set(xs, ys, grid):
+    seen, kept = set(), []
+    for x, y in zip(xs, ys):
+        if (x, y) not in seen:
+            seen.add((x, y))
+            kept.append((x, y))
+    return kept
+
+
+def dedupe_grid(xs, ys, occupancy):
+    occupied, kept = occupancy(), []
+    occupied.reset()
+    cells, width, origin, mark = occupied.cells, occupied.width, occupied.origin, occupied.mark
+    for x, y in zip(xs, ys):
+        cell = origin + y * width + x
+        if cells[cell] != mark:
+            cells[cell] = mark
+            kept.append((x, y))
+    return kept
+
+
+def dedupe_unique_np(x, y):
+    _, index = core.np.unique(x * 65536 + y, return_index=True)
+    index.sort()
+    return x[index], y[index]
+
+
+def measure(repeat, function, *args):
+    """Best time in ms and traced peak memory in KiB of function(*args)."""
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, {"ms": best * 1000, "peak_kib": peak / 1024}
+
+
+def run_case(density, repeat):
+    grid = math.sqrt(density)
+    streams = {
+        "inner": candidates(round(core.INNER_POINTS * density), 7, 10.5, 8, grid),
+        "halo": candidates(round((core.HALO_POINTS + core.HALO_EXTRA_POINTS) * density),
+                           core.HALO_SHRINK, core.HALO_SHRINK, 0, grid),
+    }
+    # The build allocates a grid once per heart; calc reuses one grid for every frame's halo
+    halo_grid = core.OccupancyGrid(grid)
+    occupancy = {"inner": lambda: core.OccupancyGrid(grid), "halo": lambda: halo_grid}
+    results = {}
+    for name, (xs, ys) in streams.items():
+        by_set, set_cost = measure(repeat, dedupe_set, xs, ys, grid)
+        by_grid, grid_cost = measure(repeat, dedupe_grid, xs, ys, occupancy[name])
+        results[f"python:{name}"] = {"candidates": len(xs), "kept": len(by_grid), "same": by_set == by_grid,
+                                     "set": set_cost, "grid": grid_cost}
+        if core.np is not None:
+            x, y = core.np.array(xs), core.np.array(ys)
+            by_unique, unique_cost = measure(repeat, dedupe_unique_np, x, y)
+            by_grid, grid_cost = measure(repeat, core.unique_points_np, x, y)
+            same = all((a == b).all() for a, b in zip(by_unique, by_grid))
+            results[f"numpy:{name}"] = {"candidates": len(xs), "kept": len(by_grid[0]), "same": same,
+                                        "unique": unique_cost, "grid": grid_cost}
+    return {"density": density, "streams": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--densities", nargs="+", type=float, default=[1.0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    random.seed(core.DEFAULT_SEED)
+    core.heart_table()
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": getattr(core.np, "__version__", None),
+        "cases": [run_case(density, args.repeat) for density in args.densities],
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
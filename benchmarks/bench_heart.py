@@ -0,0 +1,205 @@
+"""Headless benchmarks for the heart's build, calc and render stages.
+
+Runs without a display: pygame is driven through SDL's dummy video driver and
+rendered into an offscreen Surface, and the Tkinter path is measured through
+its PPM rasterization, which is what the image render mode pays per frame.
+Each case also sizes its frame store against a keyframed heart of the same
+cycle and times the keyframed heart's per-frame rebuilds. With numpy, the
+rotating 3D heart is timed at each of --solid-sizes through a full turn, and its
+numpy painting is checked against the pure-Python painter.
+
+    python benchmarks/bench_heart.py --scales 1 2 4 --frames 20 60 --output bench.json
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.append(ROOT)
+from heart import core
+
+# The toolkit each front-end directory needs
+TOOLKITS = {"pygame": "pygame", "Tkinter": "tkinter"}
+
+
+def load_front_end(name):
+    """Import a front-end script by path, or return None if its toolkit is missing."""
+    # Without the real library, `import pygame` still finds the repository's own pygame/
+    # directory as a namespace package, which has no origin
+    toolkit = importlib.util.find_spec(TOOLKITS[name])
+    if toolkit is None or toolkit.origin is None:
+        return None
+    path = os.path.join(ROOT, name, "beating_heart.py")
+    spec = importlib.util.spec_from_file_location(f"{name.lower()}_beating_heart", path)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError:
+        return None
+    return module
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def summary(samples):
+    """Seconds in, milliseconds out."""
+    samples = sorted(samples)
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": samples[0] * 1000,
+        "max_ms": samples[-1] * 1000,
+    }
+
+
+def inner_scatter(heart):
+    if heart.engine == "numpy":
+        heart.inner_scatter_points_np(heart.count(core.INNER_POINTS), lambda d: 1 / (1 + d ** 2 / 40))
+    else:
+        # Scatter into a scratch layer, so the repeats leave the heart's own inner points alone
+        points, heart.inner_scattered_points = heart.inner_scattered_points, []
+        try:
+            heart.inner_scatter_points(heart.count(core.INNER_POINTS), lambda d: 1 / (1 + d ** 2 / 40),
+                                       core.OccupancyGrid(heart.grid))
+        finally:
+            heart.inner_scattered_points = points
+
+
+def bench_render(heart, pygame_front, tk_front, frames, repeat):
+    results = {}
+    if pygame_front is not None:
+        import pygame
+
+        pygame.display.init()
+        screen = pygame.display.set_mode((core.CANVAS_WIDTH, core.CANVAS_HEIGHT))
+        for mode in pygame_front.RENDER_MODES:
+            heart.render_mode = mode
+            if mode == "surface":
+                # The first pass fills the per-frame Surface cache; time it apart from steady state
+                results["pygame:surface-rasterize"] = summary(
+                    [timed(heart.render, screen, frame) for frame in frames])
+            samples = []
+            for _ in range(repeat):
+                for frame in frames:
+                    screen.fill((0, 0, 0))
+                    samples.append(timed(heart.render, screen, frame))
+            results[f"pygame:{mode}"] = summary(samples)
+        pygame.display.quit()
+
+    viewport = core.Viewport(density=heart.density)
+    if tk_front is not None:
+        results["tk:ppm-rasterize"] = summary(
+            [timed(tk_front.rasterize_ppm, heart.all_points.columns(frame), viewport) for frame in frames])
+    results["offscreen:rgb-rasterize"] = summary(
+        [timed(core.rasterize_rgb, heart.all_points.columns(frame), viewport) for frame in frames])
+    return results
+
+
+def run_case(engine, scale, generate_frame, repeat, pygame_front, tk_front):
+    heart_class = pygame_front.Heart if pygame_front is not None else core.Heart
+    start = time.perf_counter()
+    heart = heart_class(generate_frame=0, engine=engine, seed=core.DEFAULT_SEED, density=scale)
+    build = time.perf_counter() - start
+    inner = [timed(inner_scatter, heart) for _ in range(repeat)]
+
+    heart.generate_frame = generate_frame
+    calc = [timed(heart.calc_frame, frame) for frame in range(generate_frame)]
+    particles = [len(heart.all_points.columns(frame)[0]) for frame in range(generate_frame)]
+    render = bench_render(heart, pygame_front, tk_front, range(generate_frame), repeat)
+
+    # The same cycle kept as keyframes: one frame held, each frame rebuilt when looked up
+    keyframed = core.Heart(generate_frame=generate_frame, engine=engine, seed=core.DEFAULT_SEED, density=scale,
+                           keyframes=True)
+    rebuild = [timed(keyframed.all_points.columns, frame) for frame in range(generate_frame)]
+
+    return {
+        "engine": engine,
+        "scale": scale,
+        "generate_frame": generate_frame,
+        "particles_per_frame": statistics.fmean(particles),
+        "build_ms": build * 1000,
+        "inner_scatter_points": summary(inner),
+        "calc": summary(calc),
+        "frame_bytes": heart.all_points.nbytes,
+        "keyframe_bytes": keyframed.all_points.nbytes,
+        "keyframe_rebuild": summary(rebuild),
+        "render": render,
+    }
+
+
+def bench_solid(sizes, turns=60):
+    """Build the 3D heart, then time whole frames at evenly spaced angles through one turn per canvas size."""
+    from heart.solid import SolidHeart
+
+    start = time.perf_counter()
+    solid = SolidHeart()
+    result = {"particles": solid.points.shape[1], "build_ms": (time.perf_counter() - start) * 1000}
+    for width, height in sizes:
+        viewport = core.Viewport(width, height)
+        angles = [2 * math.pi * turn / turns for turn in range(turns)]
+        for glow in (False, True):
+            samples = [timed(solid.rgb, viewport, angle, turn / 10, glow) for turn, angle in enumerate(angles)]
+            result[f"{width}x{height}:{'glow' if glow else 'rgb'}"] = summary(samples)
+
+    # Near squares must cover far ones in the numpy painter just as in the particle-by-particle loop
+    width, height = sizes[0]
+    pixels, shades = solid.pixels(core.Viewport(width, height), 1.0, 0.25)
+    painted = core.paint_rgb(width, height, pixels, solid.palette, shades)
+    looped = core.paint_rgb(width, height, [column.tolist() for column in pixels], solid.palette, shades.tolist())
+    result["largest_particle"] = int(pixels[2].max())
+    result["same_as_python"] = painted == looped
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engines", nargs="+", default=list(core.ENGINES if core.np is not None else ["python"]),
+                        choices=core.ENGINES)
+    parser.add_argument("--scales", nargs="+", type=float, default=[1.0],
+                        help="heart densities (particle count multipliers) to sweep")
+    parser.add_argument("--frames", nargs="+", type=int, default=[20],
+                        help="generate_frame values to sweep")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions of the repeatable stages")
+    parser.add_argument("--solid-sizes", nargs="+", default=["640x600", "1280x720"], metavar="WxH",
+                        help="canvas sizes to time the 3D heart at")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    pygame_front = load_front_end("pygame")
+    tk_front = load_front_end("Tkinter")
+    cases = [run_case(engine, scale, frames, args.repeat, pygame_front, tk_front)
+             for engine in args.engines for scale in args.scales for frames in args.frames]
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": getattr(core.np, "__version__", None),
+        "cases": cases,
+    }
+    if core.np is not None:
+        report["solid"] = bench_solid([tuple(map(int, size.split("x"))) for size in args.solid_sizes])
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
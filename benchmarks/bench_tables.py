@@ -0,0 +1,115 @@
+"""Benchmark and distribution check for the heart outline lookup table.
+
+Compares sampling heart_function at random t against reading random rows of
+heart_table, in both engines, and checks that the two produce the same
+distribution of integer pixels: the total variation distance between them
+should sit at the noise floor set by two independent draws of the exact one.
+
+    python benchmarks/bench_tables.py --samples 200000 --output tables.json
+"""
+
+import argparse
+import collections
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.append(ROOT)
+from heart import core
+
+SHRINK_RATIOS = {"edge": core.IMAGE_ENLARGEMENT, "halo": core.HALO_SHRINK}
+
+
+def exact_points(number, shrink_ratio):
+    return [core.heart_function(random.uniform(0, 2 * math.pi), shrink_ratio) for _ in range(number)]
+
+
+def table_points(number, shrink_ratio):
+    table_x, table_y = core.heart_table()
+    rows = len(table_x)
+    points = []
+    for _ in range(number):
+        index = int(random.random() * rows)
+        points.append((int(table_x[index] * shrink_ratio), int(table_y[index] * shrink_ratio)))
+    return points
+
+
+def exact_points_np(rng, number, shrink_ratio):
+    return core.heart_function_np(rng.uniform(0, 2 * math.pi, number), shrink_ratio)
+
+
+def best_of(repeat, function, *args):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        samples.append(time.perf_counter() - start)
+    return min(samples) * 1000
+
+
+def total_variation(first, second):
+    """Total variation distance between two samples' distributions over integer pixels."""
+    first, second = collections.Counter(first), collections.Counter(second)
+    n_first, n_second = sum(first.values()), sum(second.values())
+    return 0.5 * sum(abs(first[key] / n_first - second[key] / n_second) for key in first.keys() | second.keys())
+
+
+def timings(samples, repeat):
+    results = {}
+    for name, shrink_ratio in SHRINK_RATIOS.items():
+        exact = best_of(repeat, exact_points, samples, shrink_ratio)
+        table = best_of(repeat, table_points, samples, shrink_ratio)
+        results[f"python:{name}"] = {"exact_ms": exact, "table_ms": table, "speedup": exact / table}
+        if core.np is not None:
+            rng = core.np.random.default_rng(0)
+            exact = best_of(repeat, exact_points_np, rng, samples, shrink_ratio)
+            table = best_of(repeat, core.heart_points_np, rng, samples, shrink_ratio)
+            results[f"numpy:{name}"] = {"exact_ms": exact, "table_ms": table, "speedup": exact / table}
+    return results
+
+
+def distributions(samples):
+    random.seed(core.DEFAULT_SEED)
+    results = {}
+    for name, shrink_ratio in SHRINK_RATIOS.items():
+        exact = exact_points(samples, shrink_ratio)
+        results[name] = {
+            "table_vs_exact": total_variation(table_points(samples, shrink_ratio), exact),
+            "exact_vs_exact": total_variation(exact_points(samples, shrink_ratio), exact),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=200000, help="points drawn per measurement")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    core.heart_table()  # built once per process, keep it out of the timings
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": getattr(core.np, "__version__", None),
+        "table_size": core.HEART_TABLE_SIZE,
+        "samples": args.samples,
+        "timings": timings(args.samples, args.repeat),
+        "total_variation": distributions(args.samples),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""Code shared by the pygame and Tkinter beating heart front ends.
+
+heart.core holds the renderer-agnostic simulation, heart.frames the frame
+containers, heart.cache the on-disk cache, heart.lod adaptive level of detail,
+heart.tempo the live BPM clock, heart.timing per-stage timings, heart.scene
+many hearts on one canvas, heart.component a heart that builds in the
+background, heart.glow additive glow rendering and heart.solid a rotating 3D
+particle heart; none of them open a window.
+"""
+
+from .component import HeartComponent
+from .core import Heart, Viewport
+from .frames import FrameCache, FrameStore, KeyframeStore
+from .lod import AdaptiveDetail
+from .scene import HeartInstance, Scene
+from .solid import SolidHeart
+
+__all__ = ["AdaptiveDetail", "FrameCache", "FrameStore", "Heart", "HeartComponent", "HeartInstance", "KeyframeStore",
+           "Scene", "SolidHeart", "Viewport"]
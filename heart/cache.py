@@ -0,0 +1,114 @@
+"""Persistent on-disk cache of built hearts and their precomputed frames.
+
+A cache file is a small JSON header followed by raw little-endian column
+buffers, so a warm start only needs to mmap the file and cast slices of it.
+The file name is a hash of every parameter that affects the output, and both
+front ends read and write the same format.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"BHEART01"
+FORMAT_VERSION = 2  # 2: per-frame layer counts in the header meta
+ALIGNMENT = 8
+
+# struct codes of the column buffers, as understood by memoryview.cast
+TYPECODES = {"h": 2, "B": 1, "d": 8}
+
+
+def cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.environ.get("BEATING_HEART_CACHE", os.path.join(base, "beating-heart"))
+
+
+def cache_key(params):
+    """Stable hash of the parameters that determine a heart's points and frames."""
+    blob = json.dumps({"format": FORMAT_VERSION, **params}, sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:32]
+
+
+def cache_path(params, directory=None):
+    return os.path.join(directory or cache_dir(), f"{cache_key(params)}.bin")
+
+
+def save(path, params, columns, meta=None):
+    """Write named column buffers (anything exposing the buffer protocol) to path.
+
+    The file is written next to its final name and renamed into place, so readers
+    never see a partial cache. Raises OSError if the file cannot be written.
+    """
+    if sys.byteorder != "little":
+        raise RuntimeError("the heart cache format is little-endian only")
+
+    sections = {}
+    offset = 0
+    for name, column in columns.items():
+        view = memoryview(column)
+        if view.format not in TYPECODES:
+            raise ValueError(f"cannot cache column {name!r} of type {view.format!r}")
+        sections[name] = [offset, view.format, len(view)]
+        offset += -(-view.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header = json.dumps({"params": params, "meta": meta or {}, "sections": sections}).encode()
+    data_start = -(-(len(MAGIC) + 4 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as handle:
+            handle.write(MAGIC + struct.pack("<I", len(header)) + header)
+            for name, column in columns.items():
+                handle.seek(data_start + sections[name][0])
+                handle.write(memoryview(column).cast("B"))
+            handle.truncate(data_start + offset)
+        os.replace(temporary, path)
+    except OSError:
+        # A full disk or a failed rename must not leave a stray temporary file behind
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def load(path, params):
+    """Map a cache file and return (meta, columns), or None if it is missing, stale or damaged.
+
+    The columns are read-only memoryviews into the mapping, cast to their stored type.
+    """
+    try:
+        with open(path, "rb") as handle:
+            mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    view = memoryview(mapping)
+    try:
+        if view[:len(MAGIC)] != MAGIC:
+            return None
+        (header_size,) = struct.unpack_from("<I", view, len(MAGIC))
+        header_end = len(MAGIC) + 4 + header_size
+        if header_end > len(view):
+            return None
+        header = json.loads(bytes(view[len(MAGIC) + 4:header_end]))
+        if header["params"] != params:
+            return None
+
+        data_start = -(-header_end // ALIGNMENT) * ALIGNMENT
+        columns = {}
+        for name, (offset, typecode, length) in header["sections"].items():
+            start = data_start + offset
+            end = start + length * TYPECODES[typecode]
+            # A file cut short would otherwise load as short or empty columns
+            if end > len(view):
+                return None
+            columns[name] = view[start:end].cast(typecode)
+        return header["meta"], columns
+    except (ValueError, TypeError, KeyError, struct.error):
+        # A damaged file is a miss like a stale one: the heart rebuilds and rewrites it
+        return None
@@ -0,0 +1,102 @@
+"""An embeddable heart whose startup runs in an executor instead of blocking the host.
+
+    component = HeartComponent(generate_frame=20, on_progress=lambda done, total: print(done, total))
+    startup = asyncio.create_task(component.start())
+    ...
+    heart = component.heart_for(frame)     # never blocks; None until a preview is ready
+    if heart is not None:
+        draw(heart.all_points.columns(frame))
+
+Hosts without an asyncio loop can run start() with asyncio.run() on a thread
+of their own and poll heart_for() from their UI loop.
+"""
+
+import asyncio
+import functools
+
+from .core import DEFAULT_DENSITY, FRAMES_PER_BEAT, Heart
+
+# Preview densities, as fractions of the full heart's, built before it in this order
+PREVIEW_FRACTIONS = (0.1, 0.35)
+
+
+class HeartComponent:
+    """Builds a heart in the background, serving ever denser previews until it is complete.
+
+    start() builds one small heart per preview fraction with all its frames,
+    then builds the full heart and computes its frames one at a time. Every
+    step runs in `executor` (the loop's default thread pool when None) and
+    then calls on_progress(done, total) on the event loop. Hearts come from
+    heart_factory, which may be a front end's Heart subclass, called with
+    heart_kwargs.
+    """
+
+    def __init__(self, heart_factory=Heart, preview_fractions=PREVIEW_FRACTIONS, executor=None,
+                 on_progress=None, **heart_kwargs):
+        self.heart_factory = heart_factory
+        self.heart_kwargs = heart_kwargs
+        self.executor = executor
+        self.on_progress = on_progress
+        # BeatClock.position() only needs these two, so it can take the component before any heart exists
+        self.generate_frame = heart_kwargs.setdefault("generate_frame", 20)
+        self.frames_per_beat = heart_kwargs.setdefault("frames_per_beat", FRAMES_PER_BEAT)
+        self.density = heart_kwargs.get("density", DEFAULT_DENSITY)
+        self.preview_fractions = [fraction for fraction in preview_fractions if fraction < 1]
+        self.hearts = []  # hearts ready to draw from, densest last
+        self.heart = None
+        self.done = 0
+        self.total = len(self.preview_fractions) + 1 + self.generate_frame
+
+    @property
+    def ready(self):
+        return self.done == self.total
+
+    def heart_for(self, *frames):
+        """The densest heart holding every one of frames, or None before the first preview is ready."""
+        for heart in reversed(self.hearts):
+            if all(frame in heart.all_points for frame in frames):
+                return heart
+        return None
+
+    def step(self):
+        self.done += 1
+        if self.on_progress is not None:
+            self.on_progress(self.done, self.total)
+
+    def build_preview(self, fraction):
+        heart = self.heart_factory(**{**self.heart_kwargs, "density": self.density * fraction,
+                                      "cache": False, "deferred": True})
+        for frame in range(heart.generate_frame):
+            heart.calc_frame(frame)
+        return heart
+
+    def calc_frame(self, frame):
+        with self.heart.calc_lock:
+            if frame not in self.heart.all_points:
+                self.heart.calc_frame(frame)
+                return True
+        return False
+
+    async def start(self):
+        """Build the previews, then the full heart and its frames, and return the full heart."""
+        loop = asyncio.get_running_loop()
+        for fraction in self.preview_fractions:
+            self.hearts.append(await loop.run_in_executor(self.executor, self.build_preview, fraction))
+            self.step()
+
+        build = functools.partial(self.heart_factory, **{**self.heart_kwargs, "deferred": True})
+        self.heart = await loop.run_in_executor(self.executor, build)
+        self.hearts.append(self.heart)
+        self.step()
+
+        # A cached heart may already hold its frames; compute only the missing ones, one job each
+        computed = False
+        for frame in range(self.generate_frame):
+            computed |= await loop.run_in_executor(self.executor, self.calc_frame, frame)
+            self.step()
+        if computed and self.heart.cache_file is not None:
+            await loop.run_in_executor(self.executor, self.heart.save_cache)
+
+        # The previews have served their purpose
+        self.hearts = [self.heart]
+        return self.heart
@@ -0,0 +1,787 @@
+"""Renderer-agnostic beating heart simulation shared by the pygame and Tkinter front ends.
+
+Importing this module has no side effects: no window, display or event loop is
+touched, so it can be used headless (benchmarks, exports, worker processes).
+"""
+
+import functools
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from array import array
+from itertools import product
+from concurrent.futures import ProcessPoolExecutor
+from queue import Queue
+
+from . import cache as heart_cache
+from .frames import DEFAULT_CACHE_BYTES, FrameCache, FrameStore, KeyframeStore, blend_columns
+
+try:
+    import numpy as np
+except ImportError:  # the numpy engine is optional
+    np = None
+
+# Constants
+# The heart is simulated in reference pixels centered on the origin; a Viewport
+# fits the CANVAS_WIDTH x CANVAS_HEIGHT reference canvas onto any window
+CANVAS_WIDTH = 640
+CANVAS_HEIGHT = 600
+IMAGE_ENLARGEMENT = 11
+SUBPIXEL = 8  # stored frame coordinates are int16 in 1/SUBPIXEL reference pixels
+DEFAULT_DENSITY = 1.0  # particle count multiplier; 1 fills the reference canvas as designed
+HEART_TABLE_SIZE = 1 << 16  # samples of t in the heart outline lookup table
+HEART_COLOR = (255, 33, 33)  # RGB value for red
+FRAMES_PER_BEAT = 10  # default number of frames calc() spreads one beat over
+
+# Particle counts at DEFAULT_DENSITY and scatter strengths; every one of these is part of the cache key
+EDGE_POINTS = 2000
+EDGE_SCATTER = 3
+EDGE_BETA = 0.05
+CENTER_POINTS = 4000
+CENTER_BETA = 0.17
+INNER_POINTS = 30000
+EXTRA_INNER_POINTS = 3500
+HALO_POINTS = 3000
+HALO_EXTRA_POINTS = 4000
+HALO_SHRINK = 11.6
+DEFAULT_SEED = 0
+RANDOM_STREAMS = 4  # bump whenever the engines change which random draws they make, or in what order
+
+ENGINES = ("python", "numpy")
+DEFAULT_ENGINE = "numpy" if np is not None else "python"
+
+
+def heart_function(t, shrink_ratio=IMAGE_ENLARGEMENT):
+    x = 16 * math.sin(t)**3
+    y = 13 * math.cos(t) - 5 * math.cos(2 * t) - 2 * math.cos(3 * t) - math.cos(4 * t)
+    x *= shrink_ratio
+    y *= shrink_ratio
+    return int(x), int(-y)
+
+
+def scatter_inside(x, y, beta=0.15, rng=random):
+    ratio_x = beta * math.log(rng.random())
+    ratio_y = beta * math.log(rng.random())
+    dx = ratio_x * x
+    dy = ratio_y * y
+    return x - dx, y - dy
+
+
+def shrink(x, y, ratio):
+    force = -1 / ((x**2 + y**2)**0.6)
+    dx = ratio * force * x
+    dy = ratio * force * y
+    return x - dx, y - dy
+
+
+def curve(p):
+    return 2 * (2 * math.sin(4 * p)) / (2 * math.pi)
+
+
+def uniform_block(rng, low, high, number):
+    """`number` draws of rng.uniform(low, high), as one block."""
+    rand = rng.random
+    span = high - low
+    return [low + span * rand() for _ in range(number)]
+
+
+@functools.lru_cache(maxsize=None)
+def joint_outcomes(*columns):
+    """Every combination of one value per column, so a single uniform draw picks all of them at once."""
+    return tuple(product(*columns))
+
+
+def distance_from_center(x, y):
+    return math.hypot(x, y)
+
+
+def heart_function_np(t, shrink_ratio=IMAGE_ENLARGEMENT):
+    """Vectorized heart_function: t and shrink_ratio may be arrays."""
+    x = 16 * np.sin(t) ** 3
+    y = 13 * np.cos(t) - 5 * np.cos(2 * t) - 2 * np.cos(3 * t) - np.cos(4 * t)
+    x = x * shrink_ratio
+    y = -y * shrink_ratio
+    return x.astype(np.int64), y.astype(np.int64)
+
+
+@functools.lru_cache(maxsize=None)
+def heart_table_np(size=HEART_TABLE_SIZE):
+    """The unit heart outline (shrink_ratio 1, y pointing down) at `size` evenly spaced t in [0, 2*pi)."""
+    t = np.arange(size) * (2 * math.pi / size)
+    x = 16 * np.sin(t) ** 3
+    y = 13 * np.cos(t) - 5 * np.cos(2 * t) - 2 * np.cos(3 * t) - np.cos(4 * t)
+    return x, -y
+
+
+@functools.lru_cache(maxsize=None)
+def heart_table(size=HEART_TABLE_SIZE):
+    """heart_table_np as two lists, for the Python engine's per-point lookups."""
+    if np is not None:
+        return tuple(column.tolist() for column in heart_table_np(size))
+    xs, ys = [], []
+    for index in range(size):
+        t = index * (2 * math.pi / size)
+        xs.append(16 * math.sin(t)**3)
+        ys.append(-(13 * math.cos(t) - 5 * math.cos(2 * t) - 2 * math.cos(3 * t) - math.cos(4 * t)))
+    return xs, ys
+
+
+def heart_points_np(rng, number, shrink_ratio=IMAGE_ENLARGEMENT):
+    """`number` random heart_function_np points, looked up in the outline table instead of evaluated."""
+    xs, ys = heart_table_np()
+    index = rng.integers(0, len(xs), number)
+    return (xs[index] * shrink_ratio).astype(np.int64), (ys[index] * shrink_ratio).astype(np.int64)
+
+
+def scatter_inside_np(rng, x, y, beta=0.15):
+    ratio_x = beta * np.log(rng.random(len(x)))
+    ratio_y = beta * np.log(rng.random(len(y)))
+    dx = ratio_x * x
+    dy = ratio_y * y
+    return x - dx, y - dy
+
+
+def shrink_np(x, y, ratio):
+    force = -1 / ((x ** 2 + y ** 2) ** 0.6)
+    dx = ratio * force * x
+    dy = ratio * force * y
+    return x - dx, y - dy
+
+
+class OccupancyGrid:
+    """One byte per cell over the reference canvas, `grid` cells to a reference pixel.
+
+    Deduplicates the integer points of the edge, inner and halo layers without
+    hashing and keeping a tuple per candidate, as a set of points would. The hot
+    loops index the cells buffer directly as `origin + y * width + x`, for grid
+    points within half the canvas of its center; nothing checks that per point,
+    and a point beyond it would wrap to another row instead of failing.
+
+    A cell is occupied when it holds `mark`. reset() empties the grid by moving
+    to the next mark, so a grid reused frame after frame is only cleared once
+    every 255 resets.
+    """
+
+    # Reference pixels from the center a layer can reach: the outline, at most 16 units
+    # across and 17 down, at the largest shrink ratio any layer uses, plus the inner
+    # layer's offsets of up to 8
+    REACH = (16 * max(IMAGE_ENLARGEMENT, HALO_SHRINK, 10.5) + 8, 17 * max(IMAGE_ENLARGEMENT, HALO_SHRINK, 10.5) + 8)
+
+    def __init__(self, grid=1.0):
+        self.width = int(CANVAS_WIDTH * grid) + 1
+        height = int(CANVAS_HEIGHT * grid) + 1
+        self.origin = height // 2 * self.width + self.width // 2
+        self.cells = bytearray(self.width * height)
+        self.mark = 1
+
+    def reset(self):
+        if self.mark == 255:
+            self.cells[:] = bytes(len(self.cells))
+            self.mark = 0
+        self.mark += 1
+
+
+if OccupancyGrid.REACH[0] >= CANVAS_WIDTH / 2 or OccupancyGrid.REACH[1] >= CANVAS_HEIGHT / 2:
+    raise ValueError(f"heart layers reach {OccupancyGrid.REACH} reference pixels, past the occupancy grid")
+
+
+def unique_points_np(x, y):
+    """Drop duplicate integer (x, y) pairs, keeping first occurrences in their original order.
+
+    Dense points, like the inner layer's, go through an occupancy grid over their
+    bounding box: each cell records the first point to land in it, which is
+    linear rather than a sort. Sparse ones, like a frame's halo, would leave most
+    of that grid empty, so they are sorted instead, in memory proportional to
+    the points.
+    """
+    if len(x) == 0:
+        return x, y
+    left, top = x.min(), y.min()
+    cells = (y - top) * (x.max() - left + 1) + (x - left)
+    if (y.max() - top + 1) * (x.max() - left + 1) > 4 * len(x):
+        _, first = np.unique(cells, return_index=True)
+        first.sort()
+        return x[first], y[first]
+    order = np.arange(len(x))
+    # Assigning in reverse leaves the first occurrence owning each cell
+    owner = np.empty((y.max() - top + 1) * (x.max() - left + 1), dtype=np.int32)
+    owner[cells[::-1]] = order[::-1]
+    first = owner[cells] == order
+    return x[first], y[first]
+
+
+def stream_seed(seed, *stream):
+    """64-bit seed of one named random stream of a heart, such as ("frame", 3).
+
+    Hashing the heart's seed together with the stream's name keeps every stream
+    independent of the others, for this seed and for every other one.
+    """
+    key = json.dumps([seed, *stream]).encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def frame_seed(seed, frame):
+    """Seed for one frame's random draws, so a frame is the same whichever process computes it."""
+    return stream_seed(seed, "frame", frame)
+
+
+def density_for_canvas(width, height, density=DEFAULT_DENSITY):
+    """Heart density that keeps `density` particles per unit of screen area on a width x height canvas.
+
+    The particle count grows with the area the reference canvas is scaled up to,
+    so a fullscreen window looks as dense as the reference one.
+    """
+    return density * min(width / CANVAS_WIDTH, height / CANVAS_HEIGHT) ** 2
+
+
+class Viewport:
+    """Maps frames from the heart's centered reference space onto a width x height pixel canvas.
+
+    The reference canvas is scaled to fit and centered. Particle sizes grow with
+    the scale and shrink with the square root of the heart's density, so frames
+    drawn at any size cover the same share of the heart.
+    """
+
+    def __init__(self, width=CANVAS_WIDTH, height=CANVAS_HEIGHT, density=DEFAULT_DENSITY):
+        self.width = width
+        self.height = height
+        self.scale = min(width / CANVAS_WIDTH, height / CANVAS_HEIGHT)
+        self.size_scale = self.scale / math.sqrt(density)
+        self.center_x = width // 2
+        self.center_y = height // 2
+
+    def to_pixels(self, columns):
+        """A frame's columns as pixel x, y and size columns: int64 arrays with numpy, lists without."""
+        x, y, size = columns
+        scale = self.scale / SUBPIXEL
+        if np is not None:
+            x = np.floor(np.asarray(x) * scale + self.center_x).astype(np.int64)
+            y = np.floor(np.asarray(y) * scale + self.center_y).astype(np.int64)
+            size = np.maximum(1, np.rint(np.asarray(size) * self.size_scale)).astype(np.int64)
+            return x, y, size
+        return ([math.floor(value * scale + self.center_x) for value in x],
+                [math.floor(value * scale + self.center_y) for value in y],
+                [max(1, round(value * self.size_scale)) for value in size])
+
+    def points(self, columns):
+        """A frame's (x, y, size) pixel triples, for renderers that draw particle by particle."""
+        x, y, size = self.to_pixels(columns)
+        if np is not None:
+            return zip(x.tolist(), y.tolist(), size.tolist())
+        return zip(x, y, size)
+
+
+def rasterize_rgb(columns, viewport=None, color=HEART_COLOR):
+    """Paint one frame's columns as squares onto black, returning the viewport's packed RGB bytes."""
+    viewport = viewport or Viewport()
+    return paint_rgb(viewport.width, viewport.height, viewport.to_pixels(columns), [color])
+
+
+def paint_rgb(width, height, pixels, palette, colors=None):
+    """Paint pixel (x, y, size) columns as squares onto a black width x height canvas, as packed RGB bytes.
+
+    colors indexes palette per particle; without it every particle gets palette[0].
+    Where squares overlap, the later particle's color wins. Columns given as
+    numpy arrays are painted with numpy, lists one square at a time.
+    """
+    x, y, size = pixels
+    if np is not None and isinstance(x, np.ndarray):
+        palette = np.asarray(palette, dtype=np.uint8)
+        image = np.zeros((height, width, 3), dtype=np.uint8)
+        flat = image.reshape(-1, 3)
+        index = None
+        if colors is not None:
+            # Pixels are painted an offset at a time across all particles, so record the
+            # latest particle to reach each pixel and color every pixel once at the end
+            owner = np.full(height * width, -1, dtype=np.int32)
+            index = np.arange(len(x), dtype=np.int32)
+        for dy in range(int(size.max(initial=0))):
+            # Each (dx, dy) offset and its mirror cover the pixels of every square big enough
+            bx, by, bindex = x, y, index
+            if dy:
+                big = size > dy
+                bx, by = x[big], y[big]
+                if colors is not None:
+                    bindex = index[big]
+            base = by * width + bx
+            # Squares wholly on the canvas, the usual case, need no clipping per offset
+            clip = len(bx) and (bx.min() < 0 or bx.max() + dy >= width or by.min() < 0 or by.max() + dy >= height)
+            for dx in range(dy + 1):
+                for ox, oy in {(dx, dy), (dy, dx)}:
+                    inside = slice(None)
+                    if clip:
+                        px, py = bx + ox, by + oy
+                        inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+                    cells = base[inside] + (oy * width + ox)
+                    if colors is None:
+                        flat[cells] = palette[0]
+                    else:
+                        # Within one offset, a repeated cell keeps its last, and so latest, particle
+                        owner[cells] = np.maximum(owner[cells], bindex[inside])
+        if colors is not None:
+            lit = np.flatnonzero(owner >= 0)
+            flat[lit] = palette[np.asarray(colors)[owner[lit]]]
+        return image.tobytes()
+
+    pixels = bytearray(width * height * 3)
+    palette = [bytes(color) for color in palette]
+    for x, y, size, color in zip(x, y, size, colors or [0] * len(x)):
+        left, right = max(x, 0), min(x + size, width)
+        if left >= right:
+            continue
+        pixel = palette[color] * (right - left)
+        for row in range(max(y, 0), min(y + size, height)):
+            start = (row * width + left) * 3
+            pixels[start:start + (right - left) * 3] = pixel
+    return bytes(pixels)
+
+
+class Heart:
+    """The particle simulation behind both front ends.
+
+    Builds the point layers once, then fills all_points with one (x, y, size)
+    frame per step of the beat, in SUBPIXEL fixed point around the heart's
+    center; a Viewport maps them to pixels. Particle counts scale with density.
+    All randomness comes from generators seeded by `seed` (one per frame), so
+    equal seeds give equal frames in any process and in any order.
+    Rendering is left to the front ends, which subclass Heart and override
+    forget_frame() if they keep per-frame data.
+    """
+
+    # An AdaptiveDetail that front ends drawing particle by particle set to thin their draws
+    detail = None
+
+    def __init__(self, generate_frame=20, engine=DEFAULT_ENGINE, seed=None, processes=1,
+                 lazy=False, prefetch=4, cache_bytes=DEFAULT_CACHE_BYTES, cache=False,
+                 frames_per_beat=FRAMES_PER_BEAT, density=DEFAULT_DENSITY, keyframes=False, deferred=False):
+        if engine not in ENGINES:
+            raise ValueError(f"unknown engine {engine!r}, expected one of {ENGINES}")
+        if engine == "numpy" and np is None:
+            raise ImportError("the numpy engine requires numpy to be installed")
+        if lazy and keyframes:
+            raise ValueError("a heart is either lazy or keyframed, not both")
+
+        # The Python engine's built layers, as lists of (x, y); the numpy engine keeps
+        # them only as arrays, in the *_np attributes
+        self.points = []
+        self.center_diffusion_points = []
+        self.inner_scattered_points = []
+        # Lazy hearts compute frames on first use into a bounded cache instead of up front;
+        # keyframed hearts keep no frames at all and rebuild each one when it is drawn
+        if keyframes:
+            self.all_points = KeyframeStore(self.rebuild_frame, generate_frame)
+        elif lazy:
+            self.all_points = FrameCache(cache_bytes, on_evict=self.forget_frame)
+        else:
+            self.all_points = FrameStore()
+        self.generate_frame = generate_frame
+        self.frames_per_beat = frames_per_beat
+        self.density = density
+        # Integer layers snap to a grid of 1/grid reference pixels, so denser hearts get finer pixels
+        self.grid = math.sqrt(density)
+        self.beats = {}  # beat() per frame, which is the same every cycle
+        self.engine = engine
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.lazy = lazy
+        self.keyframes = keyframes
+        self.prefetch = prefetch
+        self.calc_lock = threading.Lock()
+        self.prefetch_queue = None
+        self.prefetch_pending = set()
+        self.halo_grid = None  # the Python engine's halo OccupancyGrid, made on first use
+
+        self.cache_file = heart_cache.cache_path(self.cache_params()) if cache else None
+        loaded = self.cache_file is not None and self.load_cache()
+        if not loaded:
+            if engine == "numpy":
+                self.rng = np.random.default_rng(stream_seed(self.seed, "build"))
+                self.build_np(self.count(EDGE_POINTS))
+            else:
+                self.rng = random.Random(stream_seed(self.seed, "build"))
+                self.build(self.count(EDGE_POINTS))
+        # A deferred heart only builds; its owner fills in the frames with calc_frame()
+        computed = not (lazy or keyframes or deferred) and len(self.all_points) < generate_frame
+        if computed:
+            self.precompute(processes)
+        if self.cache_file is not None and (computed or not loaded):
+            self.save_cache()
+
+    def cache_params(self):
+        """Everything that changes the built points or the frames, hashed into the cache file name."""
+        return {
+            "image_enlargement": IMAGE_ENLARGEMENT,
+            "subpixel": SUBPIXEL,
+            "heart_table": HEART_TABLE_SIZE,
+            "density": self.density,
+            "frames_per_beat": self.frames_per_beat,
+            "counts": [EDGE_POINTS, EDGE_SCATTER, CENTER_POINTS, INNER_POINTS, EXTRA_INNER_POINTS,
+                       HALO_POINTS, HALO_EXTRA_POINTS],
+            "betas": [EDGE_BETA, CENTER_BETA],
+            "halo_shrink": HALO_SHRINK,
+            "generate_frame": self.generate_frame,
+            "seed": self.seed,
+            "engine": self.engine,
+            "random_streams": RANDOM_STREAMS,
+        }
+
+    def count(self, number):
+        """A particle count from the module constants, scaled to this heart's density."""
+        return max(1, round(number * self.density))
+
+    def point_layers(self):
+        """The built layers as (name, xs, ys) in the order calc() walks them."""
+        if self.engine == "numpy":
+            layers = (self.points_np, self.center_diffusion_points_np, self.inner_scattered_points_np)
+        else:
+            layers = [tuple(zip(*points)) or ((), ())
+                      for points in (self.points, self.center_diffusion_points, self.inner_scattered_points)]
+        return [(name, xs, ys) for name, (xs, ys) in zip(("edge", "center", "inner"), layers)]
+
+    def save_cache(self):
+        """Write the build and any frames to the cache file, returning False if it cannot be written.
+
+        The cache is best-effort: a read-only or missing cache directory only costs
+        the next start its rebuild.
+        """
+        columns = {}
+        for name, xs, ys in self.point_layers():
+            columns[f"{name}_x"] = array("d", map(float, xs))
+            columns[f"{name}_y"] = array("d", map(float, ys))
+        # Lazy and keyframed hearts only cache their build; their frames come and go
+        offsets, layers = {}, {}
+        if isinstance(self.all_points, FrameStore):
+            columns.update(frame_x=self.all_points.x, frame_y=self.all_points.y, frame_size=self.all_points.size)
+            offsets, layers = self.all_points.offsets, self.all_points.layers
+        try:
+            heart_cache.save(self.cache_file, self.cache_params(), columns, meta={"offsets": offsets, "layers": layers})
+        except OSError:
+            return False
+        return True
+
+    def load_cache(self):
+        """Restore the build, and every frame if the file has them, from the memory-mapped cache."""
+        cached = heart_cache.load(self.cache_file, self.cache_params())
+        if cached is None:
+            return False
+        meta, columns = cached
+
+        layers = [(columns[f"{name}_x"], columns[f"{name}_y"]) for name in ("edge", "center", "inner")]
+        if self.engine == "numpy":
+            self.points_np, self.center_diffusion_points_np, self.inner_scattered_points_np = (
+                (np.frombuffer(xs), np.frombuffer(ys)) for xs, ys in layers)
+        else:
+            self.points, self.center_diffusion_points, self.inner_scattered_points = (
+                list(zip(xs, ys)) for xs, ys in layers)
+
+        offsets = {int(frame): tuple(span) for frame, span in meta["offsets"].items()}
+        layers = {int(frame): tuple(counts) for frame, counts in meta["layers"].items()}
+        if len(offsets) == self.generate_frame and not self.keyframes:
+            self.all_points = FrameStore.from_buffers(columns["frame_x"], columns["frame_y"],
+                                                      columns["frame_size"], offsets, layers)
+            self.lazy = False
+        return True
+
+    def precompute(self, processes=1):
+        """Compute every frame, across a process pool when processes is not 1 (None uses all cores)."""
+        if processes == 1 or self.generate_frame < 2:
+            for frame in range(self.generate_frame):
+                self.calc_frame(frame)
+            return
+
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(self,)) as pool:
+            for frame, layers, x, y, size in pool.map(_calc_frame_bytes, range(self.generate_frame)):
+                self.all_points.add_bytes(frame, x, y, size, layers)
+
+    def __getstate__(self):
+        # Pool workers get a copy of the heart without its threading state or scratch grid
+        state = self.__dict__.copy()
+        state.update(calc_lock=None, prefetch_queue=None, prefetch_pending=set(), halo_grid=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.calc_lock = threading.Lock()
+
+    def forget_frame(self, frame):
+        """Called when a lazy heart evicts a frame; front ends drop what they derived from it."""
+
+    def charge_frame(self, frame, nbytes):
+        """Count front-end data derived from a frame against a lazy heart's cache budget."""
+        if self.lazy:
+            self.all_points.charge(frame, nbytes)
+
+    def ensure_frame(self, frame):
+        """Make sure a frame is available, computing it now and queueing prefetch if lazy."""
+        if self.lazy:
+            if frame not in self.all_points:
+                with self.calc_lock:
+                    if frame not in self.all_points:
+                        self.calc_frame(frame)
+            self.request_prefetch(frame)
+        return frame
+
+    def columns_at(self, position, keep=None):
+        """Columns at a fractional frame of the cycle, blended from the frames either side of it."""
+        first = math.floor(position) % self.generate_frame
+        frames = []
+        for frame in (first, (first + 1) % self.generate_frame):
+            columns = self.all_points.columns(self.ensure_frame(frame), keep)
+            layers = self.all_points.layers[frame]
+            if keep is not None:
+                layers = [round(count * fraction) for count, fraction in zip(layers, keep)]
+            frames.append((columns, layers))
+        return blend_columns(*frames, position - math.floor(position))[0]
+
+    def draw_detailed(self, draw, frame=None, position=None):
+        """Call draw(columns) on a stored frame, or the cycle at a fractional position, thinned to self.detail.
+
+        The draw is timed, so the next call's level of detail follows how long this one took.
+        """
+        start = time.perf_counter()
+        keep = self.detail.fractions() if self.detail is not None else None
+        draw(self.all_points.columns(frame, keep) if position is None else self.columns_at(position, keep))
+        if self.detail is not None:
+            self.detail.update(time.perf_counter() - start)
+
+    def request_prefetch(self, frame):
+        if self.prefetch <= 0:
+            return
+        if self.prefetch_queue is None:
+            self.prefetch_queue = Queue()
+            threading.Thread(target=self.prefetch_worker, name="heart-prefetch", daemon=True).start()
+        for ahead in range(1, self.prefetch + 1):
+            upcoming = (frame + ahead) % self.generate_frame
+            if upcoming not in self.all_points and upcoming not in self.prefetch_pending:
+                self.prefetch_pending.add(upcoming)
+                self.prefetch_queue.put(upcoming)
+
+    def prefetch_worker(self):
+        while True:
+            frame = self.prefetch_queue.get()
+            with self.calc_lock:
+                if frame not in self.all_points:
+                    self.calc_frame(frame)
+            self.prefetch_pending.discard(frame)
+
+    def frame_columns(self, frame):
+        """One frame's (x, y, size) columns and per-layer counts, a pure function of the frame number."""
+        # Each frame draws from its own generator, never the module-level random
+        if self.engine == "numpy":
+            self.rng = np.random.default_rng(frame_seed(self.seed, frame))
+            return self.calc_np(frame)
+        self.rng = random.Random(frame_seed(self.seed, frame))
+        return self.calc(frame)
+
+    def calc_frame(self, frame):
+        self.all_points.add(frame, *self.frame_columns(frame))
+
+    def rebuild_frame(self, frame):
+        """A keyframed heart's frame, rebuilt from the base particles, its beat and its seed."""
+        store = FrameStore()
+        store.add(frame, *self.frame_columns(frame))
+        return store
+
+    def build(self, number):
+        rng = self.rng
+        grid = self.grid
+        # heart_function at a random t is a random row of the outline table, no trig needed
+        table_x, table_y = heart_table()
+        rows = range(len(table_x))
+
+        # Outer edge points
+        occupied = OccupancyGrid(grid)
+        cells, width, origin, mark = occupied.cells, occupied.width, occupied.origin, occupied.mark
+        shrink_ratio = IMAGE_ENLARGEMENT * grid
+        for index in rng.choices(rows, k=number):
+            x, y = int(table_x[index] * shrink_ratio), int(table_y[index] * shrink_ratio)
+            cell = origin + y * width + x
+            if cells[cell] != mark:
+                cells[cell] = mark
+                self.points.append((x / grid, y / grid))
+
+        # Add scattered edge points; these are floats and never collide, so only the
+        # integer pixels above need deduplicating
+        for _x, _y in self.points[:]:
+            for _ in range(EDGE_SCATTER):
+                self.points.append(scatter_inside(_x, _y, EDGE_BETA, rng))
+
+        # Center diffusion points
+        for x, y in rng.choices(self.points, k=self.count(CENTER_POINTS)):
+            self.center_diffusion_points.append(scatter_inside(x, y, CENTER_BETA, rng))
+
+        # Inner scattered points with distance-based density, plus the extra sparser ring
+        occupied = OccupancyGrid(grid)
+        self.inner_scatter_points(self.count(INNER_POINTS), lambda d: 1 / (1 + d ** 2 / 40), occupied)
+        self.inner_scatter_points(self.count(EXTRA_INNER_POINTS), lambda d: 1 / (1 + d / 100), occupied)
+
+    def build_np(self, number):
+        """Array version of build(), drawing every layer in one pass."""
+        rng = self.rng
+        grid = self.grid
+
+        # Outer edge points
+        x, y = heart_points_np(rng, number, IMAGE_ENLARGEMENT * grid)
+        x, y = unique_points_np(x, y)
+        x, y = x / grid, y / grid
+
+        # Add scattered edge points; these are floats and never collide, so only the
+        # integer pixels above need deduplicating
+        sx, sy = scatter_inside_np(rng, np.repeat(x, EDGE_SCATTER), np.repeat(y, EDGE_SCATTER), EDGE_BETA)
+        edge_x, edge_y = np.concatenate((x, sx)), np.concatenate((y, sy))
+
+        # Center diffusion points
+        choice = rng.integers(0, len(edge_x), self.count(CENTER_POINTS))
+        cx, cy = scatter_inside_np(rng, edge_x[choice], edge_y[choice], CENTER_BETA)
+
+        # Inner scattered points with distance-based density, plus the extra sparser ring
+        ix, iy = self.inner_scatter_points_np(self.count(INNER_POINTS), lambda d: 1 / (1 + d ** 2 / 40))
+        ex, ey = self.inner_scatter_points_np(self.count(EXTRA_INNER_POINTS), lambda d: 1 / (1 + d / 100))
+        ix, iy = unique_points_np(np.concatenate((ix, ex)), np.concatenate((iy, ey)))
+        ix, iy = ix / grid, iy / grid
+
+        self.points_np = (edge_x, edge_y)
+        self.center_diffusion_points_np = (cx, cy)
+        self.inner_scattered_points_np = (ix, iy)
+
+    def inner_scatter_points_np(self, number, density):
+        """Inner points in grid units, kept with probability density(distance in reference pixels)."""
+        rng = self.rng
+        grid = self.grid
+        x, y = heart_points_np(rng, number, shrink_ratio=rng.uniform(7, 10.5, number) * grid)
+        x += np.rint(rng.integers(-8, 9, number) * grid).astype(np.int64)
+        y += np.rint(rng.integers(-8, 9, number) * grid).astype(np.int64)
+        distance = np.hypot(x, y) / grid
+        keep = rng.random(number) < density(distance)
+        return x[keep], y[keep]
+
+    def inner_scatter_points(self, number, density, occupied):
+        """Add inner points kept with probability density(distance in reference pixels) where unoccupied."""
+        rng = self.rng
+        grid = self.grid
+        cells, width, origin, mark = occupied.cells, occupied.width, occupied.origin, occupied.mark
+        table_x, table_y = heart_table()
+
+        # Each random column of the layer is drawn as one block
+        indices = rng.choices(range(len(table_x)), k=number)
+        shrink_ratios = uniform_block(rng, 7 * grid, 10.5 * grid, number)
+        # Small random variation to ensure a better distribution of particles
+        steps = tuple(round(step * grid) for step in range(-8, 9))
+        offsets = rng.choices(joint_outcomes(steps, steps), k=number)
+        chances = uniform_block(rng, 0, 1, number)
+
+        for index, shrink_ratio, (offset_x, offset_y), chance in zip(indices, shrink_ratios, offsets, chances):
+            base_x = int(table_x[index] * shrink_ratio) + offset_x
+            base_y = int(table_y[index] * shrink_ratio) + offset_y
+
+            # Randomize and let particles fill from outer to inner part, thinning towards the center
+            cell = origin + base_y * width + base_x
+            if chance < density(distance_from_center(base_x, base_y) / grid) and cells[cell] != mark:
+                cells[cell] = mark
+                self.inner_scattered_points.append((base_x / grid, base_y / grid))
+
+    def beat(self, frame):
+        """Edge pull ratio, halo radius and halo particle count at a frame of the beat."""
+        if frame not in self.beats:
+            phase = frame / self.frames_per_beat * math.pi / 2
+            pulse = curve(2 * phase)
+            halo_number = self.count(HALO_POINTS + HALO_EXTRA_POINTS * abs(pulse ** 2))
+            self.beats[frame] = 10 * curve(phase), int(4 + 6 * (1 + pulse)), halo_number
+        return self.beats[frame]
+
+    def calc_layer(self, points, ratio, sizes):
+        """One layer's x, y and size columns, drawing each particle's jitter and size together in one block."""
+        outcomes = joint_outcomes((-1, 0, 1), (-1, 0, 1), sizes)
+        xs, ys, layer_sizes = [], [], []
+        for (x, y), (jitter_x, jitter_y, size) in zip(points, self.rng.choices(outcomes, k=len(points))):
+            keep = 1 - ratio / ((x ** 2 + y ** 2) ** 0.520)
+            xs.append(x * keep - jitter_x)
+            ys.append(y * keep - jitter_y)
+            layer_sizes.append(size)
+        return xs, ys, layer_sizes
+
+    def calc(self, generate_frame):
+        rng = self.rng
+        ratio, halo_radius, halo_number = self.beat(generate_frame)
+
+        # One grid per heart, reset rather than reallocated every frame
+        if self.halo_grid is None:
+            self.halo_grid = OccupancyGrid(self.grid)
+        occupied = self.halo_grid
+        occupied.reset()
+        cells, width, origin, mark = occupied.cells, occupied.width, occupied.origin, occupied.mark
+
+        # Halo glow: the outline rows, then each particle's jitter and size, drawn as two blocks
+        grid = self.grid
+        shrink_ratio = HALO_SHRINK * grid
+        table_x, table_y = heart_table()
+        indices = rng.choices(range(len(table_x)), k=halo_number)
+        outcomes = joint_outcomes(range(-14, 15), range(-14, 15), (1, 2, 3))
+        xs, ys, sizes = [], [], []
+        for index, (jitter_x, jitter_y, size) in zip(indices, rng.choices(outcomes, k=halo_number)):
+            x, y = int(table_x[index] * shrink_ratio), int(table_y[index] * shrink_ratio)
+            cell = origin + y * width + x
+            if cells[cell] != mark:
+                cells[cell] = mark
+                x, y = shrink(x / grid, y / grid, halo_radius)
+                xs.append(x + jitter_x)
+                ys.append(y + jitter_y)
+                sizes.append(size)
+        layers = [len(xs), len(self.points), len(self.center_diffusion_points),
+                  len(self.inner_scattered_points)]
+
+        # Main edge, center particles and scattered inner particles
+        for points, layer_sizes in ((self.points, (1, 2, 3)),
+                                    (self.center_diffusion_points, (1, 2)),
+                                    (self.inner_scattered_points, (1, 2))):
+            layer_x, layer_y, layer_size = self.calc_layer(points, ratio, layer_sizes)
+            xs += layer_x
+            ys += layer_y
+            sizes += layer_size
+
+        return [round(x * SUBPIXEL) for x in xs], [round(y * SUBPIXEL) for y in ys], sizes, layers
+
+    def calc_position_np(self, x, y, ratio):
+        force = 1 / ((x ** 2 + y ** 2) ** 0.520)
+        dx = ratio * force * x + self.rng.integers(-1, 2, len(x))
+        dy = ratio * force * y + self.rng.integers(-1, 2, len(y))
+        return x - dx, y - dy
+
+    def calc_np(self, generate_frame):
+        """Array version of calc(), producing the same per-frame columns and layer counts."""
+        rng = self.rng
+        ratio, halo_radius, halo_number = self.beat(generate_frame)
+
+        # Halo glow
+        hx, hy = heart_points_np(rng, halo_number, shrink_ratio=HALO_SHRINK * self.grid)
+        hx, hy = unique_points_np(hx, hy)
+        hx, hy = shrink_np(hx / self.grid, hy / self.grid, halo_radius)
+        hx += rng.integers(-14, 15, len(hx))
+        hy += rng.integers(-14, 15, len(hy))
+        layers = [(hx, hy, rng.integers(1, 4, len(hx)))]
+
+        # Main edge, center particles and scattered inner particles
+        for (x, y), low, high in ((self.points_np, 1, 3),
+                                  (self.center_diffusion_points_np, 1, 2),
+                                  (self.inner_scattered_points_np, 1, 2)):
+            x, y = self.calc_position_np(x, y, ratio)
+            layers.append((x, y, rng.integers(low, high + 1, len(x))))
+
+        x, y, size = (np.concatenate(column) for column in zip(*layers))
+        return np.rint(x * SUBPIXEL), np.rint(y * SUBPIXEL), size, [len(layer[0]) for layer in layers]
+
+
+# Process pool workers each hold an unpickled copy of the built heart
+_worker_heart = None
+
+
+def _init_worker(heart):
+    global _worker_heart
+    _worker_heart = heart
+
+
+def _calc_frame_bytes(frame):
+    store = _worker_heart.rebuild_frame(frame)
+    return (frame, store.layers[frame], *store.frame_bytes(frame))
@@ -0,0 +1,188 @@
+"""Headless export of the beating heart as an image sequence or an encoded video.
+
+Frames are rendered by a pool of worker processes and streamed to the output
+in order, with only a small window of frames in flight, so long or 4K exports
+never hold the whole animation in memory.
+
+    python -m heart.export frames/heart_%05d.png --beats 4 --size 3840x2160 --fps 60
+    python -m heart.export heart.gif --beats 2 --fps 25          # encoded by ffmpeg
+    python -m heart.export - --size 1920x1080 --fps 30 | ffmpeg -f rawvideo -pix_fmt rgb24 \\
+        -s 1920x1080 -r 30 -i - heart.mkv
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import (CANVAS_HEIGHT, CANVAS_WIDTH, DEFAULT_ENGINE, DEFAULT_SEED, ENGINES, HEART_COLOR, Heart, Viewport,
+                   density_for_canvas, rasterize_rgb)
+from .tempo import DEFAULT_BPM
+
+
+class RawWriter:
+    """Packed rgb24 frames, back to back, for piping into any encoder."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, rgb):
+        self.stream.write(rgb)
+
+    def close(self):
+        self.stream.flush()
+
+
+class ImageSequenceWriter:
+    """One file per frame from a printf-style pattern; PPM natively, other formats through Pillow."""
+
+    def __init__(self, pattern, width, height):
+        self.pattern = pattern
+        self.size = (width, height)
+        self.index = 0
+        self.image_module = None
+        if os.path.splitext(pattern)[1].lower() != ".ppm":
+            try:
+                from PIL import Image
+            except ImportError:
+                raise RuntimeError("writing non-PPM image sequences requires Pillow") from None
+            self.image_module = Image
+        os.makedirs(os.path.dirname(pattern) or ".", exist_ok=True)
+
+    def write(self, rgb):
+        path = self.pattern % self.index
+        self.index += 1
+        if self.image_module is None:
+            with open(path, "wb") as handle:
+                handle.write(b"P6 %d %d 255\n" % self.size + rgb)
+        else:
+            self.image_module.frombytes("RGB", self.size, rgb).save(path)
+
+    def close(self):
+        pass
+
+
+class FFmpegWriter:
+    """Raw frames piped to an ffmpeg process, which picks the container from the file name."""
+
+    def __init__(self, path, width, height, fps):
+        if shutil.which("ffmpeg") is None:
+            raise RuntimeError(f"encoding {path} needs ffmpeg on PATH; "
+                               "export an image sequence or raw frames to '-' instead")
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".gif":
+            options = ["-vf", "split[a][b];[a]palettegen[p];[b][p]paletteuse", "-loop", "0"]
+        elif extension in (".png", ".apng"):
+            options = ["-f", "apng", "-plays", "0"]
+        else:
+            options = ["-pix_fmt", "yuv420p"]
+        command = ["ffmpeg", "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24",
+                   "-s", f"{width}x{height}", "-r", str(fps), "-i", "-", *options, path]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, rgb):
+        self.process.stdin.write(rgb)
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {self.process.returncode}")
+
+
+def open_writer(path, width, height, fps):
+    if path == "-":
+        return RawWriter(sys.stdout.buffer)
+    if "%" in path:
+        return ImageSequenceWriter(path, width, height)
+    return FFmpegWriter(path, width, height, fps)
+
+
+# Each worker process renders frames from its own copy of the built heart
+_export_heart = None
+_export_view = None
+
+
+def _init_export_worker(heart, view):
+    global _export_heart, _export_view
+    _export_heart, _export_view = heart, view
+
+
+def _render_export_frame(index):
+    frame = _export_heart.ensure_frame(index % _export_heart.generate_frame)
+    viewport, color = _export_view
+    return rasterize_rgb(_export_heart.all_points.columns(frame), viewport, color)
+
+
+def export(path, beats=2, width=CANVAS_WIDTH, height=CANVAS_HEIGHT, fps=30, bpm=DEFAULT_BPM,
+           seed=DEFAULT_SEED, engine=DEFAULT_ENGINE, processes=None, color=HEART_COLOR, density=None):
+    """Render `beats` beats at width x height and fps, streaming every frame to path.
+
+    One beat spans round(fps * 60 / bpm) frames; the heart is scaled to fit the
+    output, with density=None picking the particle count that keeps the reference
+    look at that size. processes=None uses every core, 1 renders in this process.
+    Returns the number of frames written.
+    """
+    frames_per_beat = max(1, round(fps * 60 / bpm))
+    total = beats * frames_per_beat
+    # A lazy heart computes each beat frame on demand, once per worker
+    if density is None:
+        density = density_for_canvas(width, height)
+    heart = Heart(generate_frame=frames_per_beat, frames_per_beat=frames_per_beat, engine=engine,
+                  seed=seed, lazy=True, prefetch=0, density=density)
+    view = (Viewport(width, height, density), color)
+
+    writer = open_writer(path, width, height, fps)
+    try:
+        if processes == 1:
+            _init_export_worker(heart, view)
+            for index in range(total):
+                writer.write(_render_export_frame(index))
+        else:
+            workers = processes or os.cpu_count() or 1
+            with ProcessPoolExecutor(workers, initializer=_init_export_worker, initargs=(heart, view)) as pool:
+                # Keep a couple of frames per worker in flight and write them back in order
+                window = 2 * workers
+                pending = deque()
+                for index in range(total):
+                    pending.append(pool.submit(_render_export_frame, index))
+                    if len(pending) >= window:
+                        writer.write(pending.popleft().result())
+                while pending:
+                    writer.write(pending.popleft().result())
+    finally:
+        writer.close()
+    return total
+
+
+def parse_size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", help="'-' for raw rgb24 on stdout, a pattern with %%d for an image "
+                                       "sequence, or a video/GIF/APNG file name for ffmpeg")
+    parser.add_argument("--beats", type=int, default=2)
+    parser.add_argument("--size", type=parse_size, default=(CANVAS_WIDTH, CANVAS_HEIGHT), help="WIDTHxHEIGHT")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--bpm", type=float, default=DEFAULT_BPM)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--engine", choices=ENGINES, default=DEFAULT_ENGINE)
+    parser.add_argument("--processes", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--density", type=float,
+                        help="particle count multiplier (default: scaled with the output area)")
+    args = parser.parse_args(argv)
+
+    width, height = args.size
+    written = export(args.output, args.beats, width, height, args.fps, args.bpm, args.seed, args.engine,
+                     args.processes, density=args.density)
+    if args.output != "-":
+        print(f"wrote {written} frames to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
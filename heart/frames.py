@@ -0,0 +1,250 @@
+"""Containers for precomputed frames: a packed FrameStore, a bounded FrameCache and a KeyframeStore."""
+
+import threading
+from array import array
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+# Every frame lists its particles layer by layer, in this order
+LAYERS = ("halo", "edge", "center", "inner")
+
+
+def join_spans(buffer, spans):
+    """Concatenate [start, stop) spans of a column buffer into one new array.
+
+    Slicing an array copies it, so no view of the buffer is held while another
+    thread, such as a HeartComponent's builder, appends frames to it.
+    """
+    joined = array(buffer.typecode if isinstance(buffer, array) else buffer.format)
+    for start, stop in spans:
+        joined.frombytes(memoryview(buffer[start:stop]).cast("B"))
+    return joined
+
+
+def blend_columns(first, second, weight):
+    """Columns `weight` of the way from one frame to the next, each given as (columns, layer counts).
+
+    The edge, center and inner particles are the same in every frame, so they
+    move linearly between the two; the halo is redrawn every frame, so it and
+    every particle size come from the nearer frame.
+    """
+    (first_columns, first_layers), (second_columns, second_layers) = first, second
+    near_columns, near_layers = first if weight < 0.5 else second
+    first_halo, second_halo, halo = first_layers[0], second_layers[0], near_layers[0]
+
+    blended = []
+    for start, stop, near in zip(first_columns[:2], second_columns[:2], near_columns[:2]):
+        if np is not None:
+            start = np.asarray(start[first_halo:], dtype=np.float64)
+            body = np.rint(start + (np.asarray(stop[second_halo:]) - start) * weight)
+            blended.append(np.concatenate((np.asarray(near[:halo]), body.astype(np.int16))))
+        else:
+            body = (round(a + (b - a) * weight) for a, b in zip(start[first_halo:], stop[second_halo:]))
+            blended.append(array("h", near[:halo]) + array("h", body))
+    return (*blended, near_columns[2]), near_layers
+
+
+class FrameStore:
+    """Per-frame particles packed into contiguous int16 x/y and uint8 size buffers.
+
+    Indexing with a frame number yields its (x, y, size) triples, so it reads like
+    the dict of tuple lists it replaces without keeping a Python object per particle.
+    layers[frame] holds how many of the frame's particles belong to each of LAYERS,
+    which lets columns() thin individual layers for level of detail.
+    """
+
+    def __init__(self):
+        self.x = array("h")
+        self.y = array("h")
+        self.size = array("B")
+        self.offsets = {}
+        self.layers = {}
+
+    @classmethod
+    def from_buffers(cls, x, y, size, offsets, layers):
+        """Wrap existing column buffers, such as memory-mapped cache sections, without copying."""
+        store = cls.__new__(cls)
+        store.x, store.y, store.size, store.offsets, store.layers = x, y, size, offsets, layers
+        return store
+
+    def add(self, frame, xs, ys, sizes, layers=None):
+        start = len(self.x)
+        if np is not None and isinstance(xs, np.ndarray):
+            self.x.frombytes(xs.astype(np.int16).tobytes())
+            self.y.frombytes(ys.astype(np.int16).tobytes())
+            self.size.frombytes(sizes.astype(np.uint8).tobytes())
+        else:
+            self.x.extend(map(int, xs))
+            self.y.extend(map(int, ys))
+            self.size.extend(sizes)
+        self.finish(frame, start, layers)
+
+    def add_bytes(self, frame, x, y, size, layers=None):
+        """Append a frame shipped as raw int16/int16/uint8 column bytes."""
+        start = len(self.x)
+        self.x.frombytes(x)
+        self.y.frombytes(y)
+        self.size.frombytes(size)
+        self.finish(frame, start, layers)
+
+    def finish(self, frame, start, layers):
+        self.offsets[frame] = (start, len(self.x))
+        self.layers[frame] = tuple(layers) if layers is not None else (len(self.x) - start,)
+
+    def frame_bytes(self, frame):
+        return tuple(column.tobytes() for column in self.columns(frame))
+
+    def __getitem__(self, frame):
+        return zip(*self.columns(frame))
+
+    def columns(self, frame, keep=None):
+        """A frame's x, y and size columns; keep optionally gives the fraction of each layer to draw.
+
+        Thinning takes a prefix of each layer, and particles keep their order from
+        frame to frame, so the same particles stay visible as detail changes.
+        """
+        start, stop = self.offsets[frame]
+        if keep is None:
+            return self.x[start:stop], self.y[start:stop], self.size[start:stop]
+
+        spans = []
+        for count, fraction in zip(self.layers[frame], keep):
+            spans.append((start, start + round(count * fraction)))
+            start += count
+        return tuple(join_spans(buffer, spans) for buffer in (self.x, self.y, self.size))
+
+    def __contains__(self, frame):
+        return frame in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @property
+    def nbytes(self):
+        return sum(buffer.itemsize * len(buffer) for buffer in (self.x, self.y, self.size))
+
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class FrameCache:
+    """Least recently used frames held under a byte budget, for lazily computed cycles.
+
+    Offers the same frame lookups as FrameStore, but keeps each frame in its own
+    small FrameStore so it can be evicted. on_evict(frame) lets the owner drop
+    anything derived from an evicted frame, whose size it can charge() to the budget.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES, on_evict=None):
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self.frames = OrderedDict()
+        self.charges = {}
+        self.nbytes = 0
+        self.lock = threading.RLock()
+
+    def add(self, frame, xs, ys, sizes, layers=None):
+        store = FrameStore()
+        store.add(frame, xs, ys, sizes, layers)
+        self.insert(frame, store)
+
+    def add_bytes(self, frame, x, y, size, layers=None):
+        store = FrameStore()
+        store.add_bytes(frame, x, y, size, layers)
+        self.insert(frame, store)
+
+    def insert(self, frame, store):
+        with self.lock:
+            self.discard(frame)
+            self.frames[frame] = store
+            self.charges[frame] = store.nbytes
+            self.nbytes += store.nbytes
+            self.evict()
+
+    def charge(self, frame, nbytes):
+        """Count extra bytes held on behalf of a cached frame, e.g. its rasterized image."""
+        with self.lock:
+            if frame in self.frames:
+                self.charges[frame] += nbytes
+                self.nbytes += nbytes
+                self.evict()
+
+    def discard(self, frame):
+        with self.lock:
+            if frame in self.frames:
+                del self.frames[frame]
+                self.nbytes -= self.charges.pop(frame)
+                if self.on_evict is not None:
+                    self.on_evict(frame)
+
+    def evict(self):
+        # Always keep the newest frame, even if it alone exceeds the budget
+        while self.nbytes > self.max_bytes and len(self.frames) > 1:
+            self.discard(next(iter(self.frames)))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    def __getitem__(self, frame):
+        return zip(*self.columns(frame))
+
+    def columns(self, frame, keep=None):
+        with self.lock:
+            self.frames.move_to_end(frame)
+            return self.frames[frame].columns(frame, keep)
+
+    @property
+    def layers(self):
+        return {frame: store.layers[frame] for frame, store in self.frames.items()}
+
+    def frame_bytes(self, frame):
+        return tuple(column.tobytes() for column in self.columns(frame))
+
+    def __contains__(self, frame):
+        return frame in self.frames
+
+    def __len__(self):
+        return len(self.frames)
+
+
+class KeyframeStore(FrameCache):
+    """A whole cycle kept as keyframes, rebuilding each frame when it is looked up.
+
+    A frame is a pure function of its number (its beat ratio and random seed)
+    applied to the heart's base particles, so nothing is stored per frame.
+    rebuild(frame) returns a FrameStore holding it; only the frames rebuilt most
+    recently are held: the latest two, which blending neighbouring frames needs,
+    plus any more that fit under max_bytes. A cycle of any length so costs about
+    two frames of memory.
+    """
+
+    def __init__(self, rebuild, frames, max_bytes=0):
+        super().__init__(max_bytes)
+        self.rebuild = rebuild
+        self.frame_count = frames
+
+    def evict(self):
+        while self.nbytes > self.max_bytes and len(self.frames) > 2:
+            self.discard(next(iter(self.frames)))
+
+    def columns(self, frame, keep=None):
+        with self.lock:
+            if frame not in self.frames:
+                self.insert(frame, self.rebuild(frame))
+            return super().columns(frame, keep)
+
+    def __contains__(self, frame):
+        return 0 <= frame < self.frame_count
+
+    def __len__(self):
+        return self.frame_count
@@ -0,0 +1,47 @@
+"""Adaptive level of detail: thin particle layers until rendering fits the frame budget."""
+
+from .frames import LAYERS
+
+
+class AdaptiveDetail:
+    """Tracks render time per frame and picks how much of each layer to draw.
+
+    A single detail level in [0, 1] moves by at most `step` per frame, so density
+    fades rather than pops. Going down, the inner scatter thins first (level 1 to
+    0.5), then the halo (0.5 to 0); the edge and center layers always draw in full.
+    Detail drops while the smoothed render time exceeds `render_share` of a frame
+    at `target_fps`, and recovers once it falls below `headroom` of that budget.
+    """
+
+    def __init__(self, target_fps, render_share=0.5, min_fraction=0.15, step=0.02, headroom=0.7,
+                 smoothing=0.2):
+        self.budget = render_share / target_fps
+        self.min_fraction = min_fraction
+        self.step = step
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.level = 1.0
+        self.average = None
+
+    def update(self, render_seconds):
+        if self.average is None:
+            self.average = render_seconds
+        else:
+            self.average += self.smoothing * (render_seconds - self.average)
+
+        if self.average > self.budget:
+            self.level = max(0.0, self.level - self.step)
+        elif self.average < self.budget * self.headroom:
+            self.level = min(1.0, self.level + self.step)
+
+    def layer_fraction(self, low, high):
+        """Fraction kept of a layer that thins while the level falls from high to low."""
+        progress = min(1.0, max(0.0, (self.level - low) / (high - low)))
+        return self.min_fraction + (1 - self.min_fraction) * progress
+
+    def fractions(self):
+        """Per-layer keep fractions in LAYERS order, or None at full detail."""
+        if self.level >= 1.0:
+            return None
+        keep = {"halo": self.layer_fraction(0.0, 0.5), "inner": self.layer_fraction(0.5, 1.0)}
+        return tuple(keep.get(layer, 1.0) for layer in LAYERS)
@@ -0,0 +1,168 @@
+"""Many hearts on one canvas, all drawing from the frames of a single shared Heart.
+
+    scene = Scene(Heart(generate_frame=20), 1920, 1080)
+    scene.tile(24)                      # or scene.add(x, y, scale, phase, color) one by one
+    rgb = scene.rgb(frame)              # packed RGB bytes, every heart painted in one pass
+"""
+
+import math
+import random
+
+from .core import CANVAS_HEIGHT, CANVAS_WIDTH, DEFAULT_SEED, HEART_COLOR, SUBPIXEL, np, paint_rgb
+from .glow import paint_glow
+
+# Colors tile() hands out, starting with the single heart's red
+WALL_COLORS = (HEART_COLOR, (255, 105, 180), (255, 140, 60), (200, 60, 255), (255, 220, 90))
+
+
+class HeartInstance:
+    """One heart in a scene: its center in canvas pixels, its size, how far along the cycle it is and its color.
+
+    scale is canvas pixels per reference pixel, so 1 draws the heart at the size
+    of the reference canvas; phase is a fraction of the heart's frame cycle.
+    """
+
+    __slots__ = ("x", "y", "scale", "phase", "color")
+
+    def __init__(self, x, y, scale=1.0, phase=0.0, color=0):
+        self.x = x
+        self.y = y
+        self.scale = scale
+        self.phase = phase
+        self.color = color
+
+
+class Scene:
+    """Places many instances of one Heart on a width x height canvas and paints them all at once.
+
+    Every instance shares the heart's frames. Instances on the same frame are
+    transformed together as one block, then all particles go through a single
+    paint_rgb call, so Python overhead grows with the number of distinct frames
+    on screen rather than with the number of hearts. Hearts entirely outside
+    the canvas are skipped.
+    """
+
+    def __init__(self, heart, width=CANVAS_WIDTH, height=CANVAS_HEIGHT):
+        self.heart = heart
+        self.width = width
+        self.height = height
+        self.instances = []
+        self.palette = []
+        self.extents = {}  # reference-space bounding box per frame, for culling
+
+    def use(self, heart):
+        """Draw from another heart's frames from now on, say a denser one that has finished building."""
+        if heart is not self.heart:
+            self.heart = heart
+            self.extents.clear()
+
+    def add(self, x, y, scale=1.0, phase=0.0, color=HEART_COLOR):
+        color = tuple(color)
+        if color not in self.palette:
+            self.palette.append(color)
+        instance = HeartInstance(x, y, scale, phase, self.palette.index(color))
+        self.instances.append(instance)
+        return instance
+
+    def remove(self, instance):
+        self.instances.remove(instance)
+
+    def clear(self):
+        self.instances.clear()
+
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+
+    def tile(self, count, seed=DEFAULT_SEED, colors=WALL_COLORS):
+        """Replace the instances with count hearts on a grid, each with its own seeded size, phase and color."""
+        self.clear()
+        rng = random.Random(seed)
+        columns = math.ceil(math.sqrt(count * self.width / self.height))
+        rows = math.ceil(count / columns)
+        cell_width, cell_height = self.width / columns, self.height / rows
+        # The largest scale that keeps a heart inside its cell
+        fit = min(cell_width / CANVAS_WIDTH, cell_height / CANVAS_HEIGHT)
+        for index in range(count):
+            row, column = divmod(index, columns)
+            self.add((column + 0.5) * cell_width, (row + 0.5) * cell_height,
+                     scale=fit * rng.uniform(0.6, 1.0), phase=rng.random(), color=rng.choice(colors))
+
+    def frame_of(self, instance, position):
+        """The stored frame an instance shows when the scene is at a (possibly fractional) cycle position."""
+        cycle = self.heart.generate_frame
+        return round(position + instance.phase * cycle) % cycle
+
+    def extent(self, frame, columns):
+        if frame not in self.extents:
+            x, y = columns[0], columns[1]
+            if np is not None:
+                x, y = np.asarray(x), np.asarray(y)
+                bounds = (x.min(initial=0), x.max(initial=0), y.min(initial=0), y.max(initial=0))
+            else:
+                bounds = (min(x, default=0), max(x, default=0), min(y, default=0), max(y, default=0))
+            self.extents[frame] = tuple(int(bound) / SUBPIXEL for bound in bounds)
+        return self.extents[frame]
+
+    def visible(self, instance, frame, columns):
+        left, right, top, bottom = self.extent(frame, columns)
+        # Squares reach a few pixels past their corner, so allow a small margin
+        margin = 4 * instance.scale
+        return (instance.x + right * instance.scale + margin >= 0
+                and instance.x + left * instance.scale - margin < self.width
+                and instance.y + bottom * instance.scale + margin >= 0
+                and instance.y + top * instance.scale - margin < self.height)
+
+    def groups(self, position):
+        """Visible instances grouped by the frame they show, with that frame's columns."""
+        heart = self.heart
+        groups = {}
+        for instance in self.instances:
+            frame = heart.ensure_frame(self.frame_of(instance, position))
+            if frame not in groups:
+                groups[frame] = (heart.all_points.columns(frame), [])
+            columns, members = groups[frame]
+            if self.visible(instance, frame, columns):
+                members.append(instance)
+        return [(columns, members) for columns, members in groups.values() if members]
+
+    def pixels(self, position):
+        """Pixel x, y, size and palette index columns of every visible instance at a cycle position."""
+        size_scale = 1 / math.sqrt(self.heart.density)
+        groups = self.groups(position)
+        if np is None:
+            xs, ys, sizes, colors = [], [], [], []
+            for (x, y, size), members in groups:
+                for instance in members:
+                    scale = instance.scale / SUBPIXEL
+                    xs += [math.floor(value * scale + instance.x) for value in x]
+                    ys += [math.floor(value * scale + instance.y) for value in y]
+                    sizes += [max(1, round(value * instance.scale * size_scale)) for value in size]
+                    colors += [instance.color] * len(x)
+            return (xs, ys, sizes), colors
+
+        if not groups:
+            empty = np.zeros(0, dtype=np.int64)
+            return (empty, empty, empty), empty
+        xs, ys, sizes, colors = [], [], [], []
+        for (x, y, size), members in groups:
+            # One (instances, particles) block per frame: a row of transformed columns per instance
+            scale = np.array([instance.scale for instance in members])[:, None]
+            center_x = np.array([instance.x for instance in members])[:, None]
+            center_y = np.array([instance.y for instance in members])[:, None]
+            xs.append(np.floor(np.asarray(x) * (scale / SUBPIXEL) + center_x).astype(np.int64).ravel())
+            ys.append(np.floor(np.asarray(y) * (scale / SUBPIXEL) + center_y).astype(np.int64).ravel())
+            sizes.append(np.maximum(1, np.rint(np.asarray(size) * (scale * size_scale))).astype(np.int64).ravel())
+            colors.append(np.repeat([instance.color for instance in members], len(x)))
+        return tuple(np.concatenate(column) for column in (xs, ys, sizes)), np.concatenate(colors)
+
+    def rgb(self, position):
+        """The whole scene at a cycle position as packed RGB bytes, painted in one pass."""
+        pixels, colors = self.pixels(position)
+        return paint_rgb(self.width, self.height, pixels, self.palette or [HEART_COLOR], colors)
+
+    def glow_rgb(self, position):
+        """The scene as summed, tone-mapped light, with the halo sized for the largest heart. Requires numpy."""
+        pixels, colors = self.pixels(position)
+        scale = max((instance.scale for instance in self.instances), default=1.0)
+        return paint_glow(self.width, self.height, pixels, self.palette or [HEART_COLOR], colors, scale=scale)
@@ -0,0 +1,119 @@
+"""A 3D heart: particles on and inside an implicit heart surface, spun, beating and projected each frame.
+
+    solid = SolidHeart()
+    rgb = solid.rgb(Viewport(640, 600), angle=0.5, beats=1.25)
+
+The surface is Taubin's heart, (x^2 + 9/4 y^2 + z^2 - 1)^3 - x^2 z^3 - 9/80 y^2 z^3 = 0,
+with z up and y the depth. Particles are sampled on it once; every frame then
+costs one 3x3 rotation, a perspective divide and a counting sort of the
+particles into depth buckets, all vectorized. Requires numpy.
+"""
+
+import math
+
+from .core import DEFAULT_SEED, HEART_COLOR, Viewport, curve, np, paint_rgb
+from . import glow as heart_glow
+
+SOLID_POINTS = 100_000
+SOLID_SHELL = 0.75  # share of the particles on the surface; the rest fill the inside, dimmer
+SOLID_UNIT = 150  # reference pixels per unit of the implicit surface
+SOLID_SIZES = (1.0, 3.0)  # particle size in reference pixels at the far and near side of the heart
+SOLID_REACH = 1.2  # farthest any particle gets from the heart's center, in surface units
+CAMERA_DISTANCE = 4.0  # from the camera to the heart's center, in surface units
+DEPTH_BUCKETS = 16  # draw order and brightness steps, far to near
+DIM = 0.25  # brightness of the farthest bucket, relative to the nearest
+INSIDE_BRIGHTNESS = 0.55  # brightness of the inside particles, relative to the surface
+BEAT_DEPTH = 0.08  # how far a beat squeezes the heart
+SPIN_PERIOD = 8.0  # seconds per turn in the front ends
+
+
+def heart_surface(x, y, z):
+    """Taubin's heart: negative inside, zero on the surface and positive outside."""
+    z3 = z ** 3
+    return (x * x + 9 / 4 * y * y + z * z - 1) ** 3 - x * x * z3 - 9 / 80 * y * y * z3
+
+
+def sample_inside(rng, number):
+    """number points uniformly inside the heart, as a (3, number) array, by rejection from its bounding box."""
+    low, high = np.array([[-1.2], [-0.8], [-1.1]]), np.array([[1.2], [0.8], [1.3]])
+    batches, found = [], 0
+    while found < number:
+        points = rng.uniform(low, high, (3, 2 * number))
+        points = points[:, heart_surface(*points) < 0]
+        batches.append(points)
+        found += points.shape[1]
+    return np.concatenate(batches, axis=1)[:, :number]
+
+
+def sample_surface(rng, number, steps=16):
+    """number points on the surface, found by bisecting from the center out along random inside directions."""
+    directions = sample_inside(rng, number)
+    directions /= np.linalg.norm(directions, axis=0)
+    # The center is inside and twice the unit sphere is outside, so every ray crosses the surface between them
+    near, far = np.zeros(number), np.full(number, 2.0)
+    for _ in range(steps):
+        middle = (near + far) / 2
+        inside = heart_surface(*(directions * middle)) < 0
+        near = np.where(inside, middle, near)
+        far = np.where(inside, far, middle)
+    return directions * near
+
+
+class SolidHeart:
+    """A cloud of 3D particles shaped like a heart, drawn at any rotation and point of the beat.
+
+    Depth orders the particles and sets their size and brightness: each frame
+    buckets them by distance from the camera, far to near, and paints nearer
+    buckets over farther ones in brighter shades of color.
+    """
+
+    def __init__(self, count=SOLID_POINTS, seed=DEFAULT_SEED, shell=SOLID_SHELL, color=HEART_COLOR):
+        if np is None:
+            raise ImportError("the 3D heart requires numpy to be installed")
+        rng = np.random.default_rng(seed)
+        surface = round(count * shell)
+        self.points = np.concatenate((sample_surface(rng, surface), sample_inside(rng, count - surface)),
+                                     axis=1).astype(np.float32)
+        # Palette entries: one shade per depth bucket for the inside, then one per bucket for the surface
+        self.layer = np.repeat(np.array([DEPTH_BUCKETS, 0], dtype=np.uint8), (surface, count - surface))
+        depth = np.linspace(DIM, 1, DEPTH_BUCKETS)
+        self.brightness = np.concatenate((depth * INSIDE_BRIGHTNESS, depth)).astype(np.float32)
+        self.palette = [tuple(round(channel * shade) for channel in color) for shade in self.brightness]
+        self.color = color
+
+    def rotation(self, angle, tilt):
+        """Turn by angle about the vertical axis, then lean by tilt towards the camera."""
+        cos_a, sin_a, cos_t, sin_t = math.cos(angle), math.sin(angle), math.cos(tilt), math.sin(tilt)
+        spin = np.array([[cos_a, -sin_a, 0], [sin_a, cos_a, 0], [0, 0, 1]])
+        lean = np.array([[1, 0, 0], [0, cos_t, -sin_t], [0, sin_t, cos_t]])
+        return (lean @ spin).astype(np.float32)
+
+    def pixels(self, viewport, angle, beats, tilt=0.3):
+        """Pixel x, y, size and palette index columns at a rotation and beat, ordered far to near."""
+        # The same pulse as the flat heart's edge, squeezing the heart once per beat
+        scale = 1 - BEAT_DEPTH * curve(beats % 1 * math.pi / 2)
+        x, depth, z = self.rotation(angle, tilt) @ self.points * scale
+        perspective = CAMERA_DISTANCE / (CAMERA_DISTANCE + depth)
+        unit = SOLID_UNIT * viewport.scale
+        px = np.floor(viewport.center_x + x * perspective * unit).astype(np.int64)
+        py = np.floor(viewport.center_y - (z - 0.1) * perspective * unit).astype(np.int64)
+        # 0 on the far side of the heart, 1 on the near side
+        nearness = np.clip((SOLID_REACH - depth) / (2 * SOLID_REACH), 0, 1)
+        far, near = SOLID_SIZES
+        size = np.maximum(1, np.rint((far + (near - far) * nearness) * viewport.scale)).astype(np.int64)
+
+        # Bucket 0 is the farthest; a stable argsort of 8-bit keys is a counting sort, not a comparison sort
+        bucket = np.minimum(nearness * DEPTH_BUCKETS, DEPTH_BUCKETS - 1).astype(np.uint8)
+        order = np.argsort(bucket, kind="stable")
+        shade = bucket + self.layer
+        return (px[order], py[order], size[order]), shade[order]
+
+    def rgb(self, viewport=None, angle=0.0, beats=0.0, glow=False):
+        """The heart at a rotation and beat as the viewport's packed RGB bytes, optionally as summed light."""
+        viewport = viewport or Viewport()
+        pixels, shades = self.pixels(viewport, angle, beats)
+        if glow:
+            # Every shade is the same color, so light summed in one buffer weighted by brightness does for all
+            light = heart_glow.accumulate(viewport.width, viewport.height, pixels, self.brightness[shades])
+            return heart_glow.tone_map(heart_glow.spread(light, viewport.scale), [self.color])
+        return paint_rgb(viewport.width, viewport.height, pixels, self.palette, shades)
@@ -0,0 +1,99 @@
+"""Live tempo: beat phase driven by wall-clock time and a BPM read from stdin, a file or a socket.
+
+    echo 90 | nc -u -q0 127.0.0.1 5005     # with a front end started as --bpm udp:5005
+    echo 110 > /tmp/bpm                    # with --bpm /tmp/bpm
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+
+DEFAULT_BPM = 75
+MIN_BPM = 20
+MAX_BPM = 300
+
+
+def parse_bpm(text):
+    """The BPM in one line of input, clamped to a plausible heart rate, or None if it is not a number."""
+    try:
+        bpm = float(text.strip())
+    except ValueError:
+        return None
+    if bpm != bpm:  # NaN
+        return None
+    return min(MAX_BPM, max(MIN_BPM, bpm))
+
+
+class BeatClock:
+    """Beat phase as a continuous function of wall-clock time at a BPM that may change at any moment.
+
+    The phase, in beats, is integrated tick by tick, so a new tempo changes the
+    speed from the next tick on without making the heart jump to another frame.
+    set_bpm() is safe to call from the threads reading a BPM source.
+    """
+
+    def __init__(self, bpm=DEFAULT_BPM, clock=time.perf_counter):
+        self.set_bpm(bpm)
+        self.clock = clock
+        self.last = clock()
+        self.beats = 0.0
+
+    def set_bpm(self, bpm):
+        self.bpm = min(MAX_BPM, max(MIN_BPM, bpm))
+
+    def tick(self):
+        """Advance to now and return the phase in beats."""
+        now = self.clock()
+        self.beats += (now - self.last) * self.bpm / 60
+        self.last = now
+        return self.beats
+
+    def position(self, heart):
+        """Advance to now and return the fractional frame of the heart's cycle to draw."""
+        return self.tick() * heart.frames_per_beat % heart.generate_frame
+
+
+def follow_lines(lines, clock):
+    for line in lines:
+        bpm = parse_bpm(line)
+        if bpm is not None:
+            clock.set_bpm(bpm)
+
+
+def watch_file(path, clock, interval=0.25):
+    """Poll a file and apply the last BPM written to it whenever it changes."""
+    modified = None
+    while True:
+        try:
+            stamp = os.stat(path).st_mtime_ns
+            if stamp != modified:
+                modified = stamp
+                with open(path) as handle:
+                    follow_lines(handle.read().splitlines()[-1:], clock)
+        except OSError:
+            pass
+        time.sleep(interval)
+
+
+def watch_udp(port, clock, host="127.0.0.1"):
+    """Apply every BPM sent as a UDP datagram to host:port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as server:
+        server.bind((host, port))
+        while True:
+            data, _ = server.recvfrom(1024)
+            follow_lines(data.decode(errors="replace").splitlines(), clock)
+
+
+def open_bpm_source(source, clock):
+    """Start a daemon thread feeding clock from '-' (stdin), 'udp:PORT' or a file path."""
+    if source == "-":
+        target, args = follow_lines, (sys.stdin, clock)
+    elif source.startswith("udp:"):
+        target, args = watch_udp, (int(source[4:]), clock)
+    else:
+        target, args = watch_file, (source, clock)
+    thread = threading.Thread(target=target, args=args, name="heart-bpm", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,98 @@
+"""Per-stage timing for the front ends' render loops: rolling percentiles and a trace dump.
+
+    timer = StageTimer(enabled=True, trace=True)
+    with timer.stage("render"):
+        heart.render(screen, frame)
+    timer.dump("heart.trace.json")    # open in chrome://tracing or https://ui.perfetto.dev
+
+A disabled timer hands every stage() the same no-op context manager, so an
+instrumented loop costs one method call per stage when timing is off.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+
+_NO_STAGE = contextlib.nullcontext()
+
+
+class _Stage:
+    """Times one named stage; reused for every pass so timing allocates nothing per frame."""
+
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info):
+        self.timer.add(self.name, self.start, time.perf_counter_ns() - self.start)
+
+
+class StageTimer:
+    """Rolling per-stage timings over the last `window` samples, optionally recorded as trace events.
+
+    Traced events are capped at `trace_limit`, keeping the most recent, so a
+    long session cannot grow without bound.
+    """
+
+    def __init__(self, enabled=False, window=240, trace=False, trace_limit=200_000):
+        self.enabled = enabled or trace
+        self.window = window
+        self.samples = {}
+        self.stages = {}
+        self.events = deque(maxlen=trace_limit) if trace else None
+        self.origin = time.perf_counter_ns()
+
+    def stage(self, name):
+        """Context manager timing one pass through a stage."""
+        if not self.enabled:
+            return _NO_STAGE
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = _Stage(self, name)
+        return stage
+
+    def add(self, name, start_ns, duration_ns):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(duration_ns)
+        if self.events is not None:
+            self.events.append((name, start_ns, duration_ns, threading.get_ident()))
+
+    def record(self, name, seconds):
+        """Add a duration measured elsewhere, such as the interval between two frames, ending now."""
+        if self.enabled:
+            duration = int(seconds * 1e9)
+            self.add(name, time.perf_counter_ns() - duration, duration)
+
+    def percentiles(self, name, points=(50, 99)):
+        """Milliseconds at each percentile of a stage's recent samples (nearest rank), or None."""
+        samples = self.samples.get(name)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return tuple(ordered[min(len(ordered) - 1, len(ordered) * point // 100)] / 1e6 for point in points)
+
+    def summary(self):
+        """One 'stage  p50  p99' line per stage, slowest p99 first."""
+        rows = [(name, *self.percentiles(name)) for name in self.samples]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return [f"{name:<8} p50 {p50:6.2f} ms  p99 {p99:6.2f} ms" for name, p50, p99 in rows]
+
+    def dump(self, path):
+        """Write the traced events as Chrome trace JSON, which chrome://tracing and Perfetto read."""
+        pid = os.getpid()
+        events = [{"name": name, "ph": "X", "ts": (start - self.origin) / 1000, "dur": duration / 1000,
+                   "pid": pid, "tid": tid}
+                  for name, start, duration, tid in (self.events or ())]
+        with open(path, "w") as handle:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, handle)
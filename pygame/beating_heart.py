@@ -1,382 +1,258 @@
-import pygame
-import random
+import argparse
+import asyncio
 import math
+import os
+import sys
+import time
 
-# Constants
-CANVAS_WIDTH = 640
-CANVAS_HEIGHT = 600
-CANVAS_CENTER_X = CANVAS_WIDTH // 2
-CANVAS_CENTER_Y = CANVAS_HEIGHT // 2
-IMAGE_ENLARGEMENT = 11
-HEART_COLOR = (255, 33, 33)  # RGB value for red
-
-# Initialize Pygame
-pygame.init()
-screen = pygame.display.set_mode((CANVAS_WIDTH, CANVAS_HEIGHT))
-pygame.display.set_caption("Beating Heart")
-clock = pygame.time.Clock()
-
-def heart_function(t, shrink_ratio=IMAGE_ENLARGEMENT):
-    x = 16 * math.sin(t)**3
-    y = 13 * math.cos(t) - 5 * math.cos(2 * t) - 2 * math.cos(3 * t) - math.cos(4 * t)
-    x *= shrink_ratio
-    y *= shrink_ratio
-    return int(x + CANVAS_CENTER_X), int(-y + CANVAS_CENTER_Y)
-
-def scatter_inside(x, y, beta=0.15):
-    ratio_x = beta * math.log(random.random())
-    ratio_y = beta * math.log(random.random())
-    dx = ratio_x * (x - CANVAS_CENTER_X)
-    dy = ratio_y * (y - CANVAS_CENTER_Y)
-    return x - dx, y - dy
-
-def shrink(x, y, ratio):
-    force = -1 / (((x - CANVAS_CENTER_X)**2 + (y - CANVAS_CENTER_Y)**2)**0.6)
-    dx = ratio * force * (x - CANVAS_CENTER_X)
-    dy = ratio * force * (y - CANVAS_CENTER_Y)
-    return x - dx, y - dy
-
-def curve(p):
-    return 2 * (2 * math.sin(4 * p)) / (2 * math.pi)
-
-def distance_from_center(x, y):
-    return math.sqrt((x - CANVAS_CENTER_X) ** 2 + (y - CANVAS_CENTER_Y) ** 2)
-
-class Heart:
-    def __init__(self, generate_frame=20):
-        self.points = set()
-        self.center_diffusion_points = set()
-        self.inner_scattered_points = set()
-        self.all_points = {}
-        self.generate_frame = generate_frame
-        self.build(2000)
-
-        for frame in range(generate_frame):
-            self.calc(frame)
-
-    def build(self, number):
-        # Outer edge points
-        for _ in range(number):
-            t = random.uniform(0, 2 * math.pi)
-            x, y = heart_function(t)
-            self.points.add((x, y))
-
-        # Add scattered edge points
-        for _x, _y in list(self.points):
-            for _ in range(3):
-                x, y = scatter_inside(_x, _y, 0.05)
-                self.points.add((x, y))
-
-        # Center diffusion points
-        point_list = list(self.points)
-        for _ in range(4000):
-            x, y = random.choice(point_list)
-            x, y = scatter_inside(x, y, 0.17)
-            self.center_diffusion_points.add((x, y))
-
-        # Inner scattered points with distance-based density
-        self.inner_scatter_points()
-
-        # Extra scattered inner particles with density based on distance
-        for _ in range(3500):
-            t = random.uniform(0, 2 * math.pi)
-            base_x, base_y = heart_function(t, shrink_ratio=random.uniform(7, 10.5))
-            base_x += random.randint(-8, 8)
-            base_y += random.randint(-8, 8)
-
-            # Decrease particle density as we move closer to the center
-            distance = distance_from_center(base_x, base_y)
-            density_factor = 1 / (1 + distance / 100)
-
-            # Randomize density based on distance
-            if random.random() < density_factor:
-                self.inner_scattered_points.add((base_x, base_y))
-
-    def inner_scatter_points(self):
-        """Generate particles to fill the inner space of the heart and ensure it reaches the center."""
-        for _ in range(30000):  # Increase the number of particles to cover all space
-            t = random.uniform(0, 2 * math.pi)
-            base_x, base_y = heart_function(t, shrink_ratio=random.uniform(7, 10.5))
-
-            # Add small random variation to ensure a better distribution of particles
-            base_x += random.randint(-8, 8)
-            base_y += random.randint(-8, 8)
-
-            # Calculate the distance from the center
-            distance = distance_from_center(base_x, base_y)
-
-            # Adjust the density factor to allow more particles to reach the center
-            density_factor = 1 / (1 + (distance ** 2) / 40)  # Smooth gradient to allow more particles closer to center
-
-            # Randomize and let particles fill from outer to inner part
-            if random.random() < density_factor:
-                self.inner_scattered_points.add((base_x, base_y))
-
-    def calc_position(self, x, y, ratio):
-        force = 1 / (((x - CANVAS_CENTER_X) ** 2 + (y - CANVAS_CENTER_Y) ** 2) ** 0.520)
-        dx = ratio * force * (x - CANVAS_CENTER_X) + random.randint(-1, 1)
-        dy = ratio * force * (y - CANVAS_CENTER_Y) + random.randint(-1, 1)
-        return x - dx, y - dy
-
-    def calc(self, generate_frame):
-        ratio = 10 * curve(generate_frame / 20 * math.pi)
-        halo_radius = int(4 + 6 * (1 + curve(generate_frame / 10 * math.pi)))
-        halo_number = int(3000 + 4000 * abs(curve(generate_frame / 10 * math.pi) ** 2))
-
-        all_points = []
-        heart_halo_point = set()
-
-        # Halo glow
-        for _ in range(halo_number):
-            t = random.uniform(0, 2 * math.pi)
-            x, y = heart_function(t, shrink_ratio=11.6)
-            x, y = shrink(x, y, halo_radius)
-            if (x, y) not in heart_halo_point:
-                heart_halo_point.add((x, y))
-                x += random.randint(-14, 14)
-                y += random.randint(-14, 14)
-                size = random.choice((1, 2, 3))
-                all_points.append((x, y, size))
-
-        # Main edge
-        for x, y in self.points:
-            x, y = self.calc_position(x, y, ratio)
-            size = random.randint(1, 3)
-            all_points.append((x, y, size))
-
-        # Center particles
-        for x, y in self.center_diffusion_points:
-            x, y = self.calc_position(x, y, ratio)
-            size = random.randint(1, 2)
-            all_points.append((x, y, size))
-
-        # Scattered inner particles with distance-based density
-        for x, y in self.inner_scattered_points:
-            x, y = self.calc_position(x, y, ratio)
-            size = random.choice((1, 2))
-            all_points.append((x, y, size))
+import pygame
 
-        self.all_points[generate_frame] = all_points
+# The shared heart package lives at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from heart import core
+from heart.component import HeartComponent
+from heart.core import CANVAS_HEIGHT, CANVAS_WIDTH, DEFAULT_SEED, HEART_COLOR
+from heart.glow import rasterize_glow
+from heart.lod import AdaptiveDetail
+from heart.scene import Scene
+from heart.solid import SPIN_PERIOD, SolidHeart
+from heart.tempo import DEFAULT_BPM, BeatClock, open_bpm_source
+from heart.timing import StageTimer
+
+FPS = 20
+# With a live BPM the beat phase follows the wall clock, so the display can refresh faster
+LIVE_FPS = 60
+
+# "rect" draws one pygame.draw.rect per particle, "blits" hands prebuilt square
+# stamps to a single Surface.blits call, "surface" rasterizes each frame once into
+# a cached Surface and blits that whole, and "glow" caches frames the same way but
+# sums their particles' light and tone-maps it, which needs numpy
+RENDER_MODES = ("rect", "blits", "surface") + (("glow",) if core.np is not None else ())
+# Modes that draw a whole frame as one cached Surface
+SURFACE_MODES = ("surface", "glow")
+
+class Heart(core.Heart):
+    """pygame back end: draws the shared simulation's frames onto a Surface."""
+
+    def __init__(self, *args, render_mode="surface", target_fps=None, **kwargs):
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"unknown render mode {render_mode!r}, expected one of {RENDER_MODES}")
+        self.render_mode = render_mode
+        # Only the per-particle modes scale with particle count, so only they adapt
+        self.detail = AdaptiveDetail(target_fps) if target_fps else None
+        self.stamps = {}
+        self.frame_surfaces = {}
+        super().__init__(*args, **kwargs)
+        self.viewport = core.Viewport(CANVAS_WIDTH, CANVAS_HEIGHT, self.density)
+
+    def resize(self, width, height):
+        """Draw the same frames at a new window size; only the cached Surfaces are redone."""
+        self.viewport = core.Viewport(width, height, self.density)
+        self.frame_surfaces.clear()
+
+    def stamp(self, size):
+        if size not in self.stamps:
+            surface = pygame.Surface((size, size))
+            surface.fill(HEART_COLOR)
+            self.stamps[size] = surface
+        return self.stamps[size]
+
+    def blit_columns(self, render_canvas, columns):
+        points = list(self.viewport.points(columns))
+        stamps = {size: self.stamp(size) for size in {point[2] for point in points}}
+        render_canvas.blits([(stamps[size], (x, y)) for x, y, size in points], doreturn=False)
+
+    def glow_surface(self, render_canvas, columns):
+        """Sum a frame's light into one buffer, tone-map it and upload it as a single Surface."""
+        size = (self.viewport.width, self.viewport.height)
+        return pygame.image.frombuffer(rasterize_glow(columns, self.viewport), size, "RGB").convert(render_canvas)
+
+    def frame_surface(self, render_canvas, frame):
+        """Rasterize a frame once per surface mode and keep it for every later beat."""
+        key = (self.render_mode, frame)
+        surface = self.frame_surfaces.get(key)
+        if surface is None:
+            if self.render_mode == "glow":
+                surface = self.glow_surface(render_canvas, self.all_points.columns(frame))
+            else:
+                surface = pygame.Surface(render_canvas.get_size()).convert(render_canvas)
+                surface.fill((0, 0, 0))
+                self.blit_columns(surface, self.all_points.columns(frame))
+            self.frame_surfaces[key] = surface
+            self.charge_frame(frame, surface.get_bytesize() * surface.get_width() * surface.get_height())
+        return surface
+
+    def forget_frame(self, frame):
+        for mode in SURFACE_MODES:
+            self.frame_surfaces.pop((mode, frame), None)
 
     def render(self, render_canvas, render_frame):
-        for x, y, size in self.all_points[render_frame % self.generate_frame]:
-            pygame.draw.rect(render_canvas, HEART_COLOR, pygame.Rect(x, y, size, size))
-
-# Main game loop
-def main():
-    heart = Heart(generate_frame=20)
+        frame = self.ensure_frame(render_frame % self.generate_frame)
+        if self.render_mode in SURFACE_MODES:
+            render_canvas.blit(self.frame_surface(render_canvas, frame), (0, 0))
+            return
+
+        self.draw_detailed(lambda columns: self.draw_columns(render_canvas, columns), frame=frame)
+
+    def render_at(self, render_canvas, position):
+        """Draw the cycle at a fractional frame; a live tempo seldom repeats one, so nothing is cached."""
+        if self.render_mode == "glow":
+            render_canvas.blit(self.glow_surface(render_canvas, self.columns_at(position)), (0, 0))
+            return
+
+        self.draw_detailed(lambda columns: self.draw_columns(render_canvas, columns), position=position)
+
+    def draw_columns(self, render_canvas, columns):
+        if self.render_mode == "rect":
+            for x, y, size in self.viewport.points(columns):
+                pygame.draw.rect(render_canvas, HEART_COLOR, pygame.Rect(x, y, size, size))
+        else:
+            self.blit_columns(render_canvas, columns)
+
+def render_scene(render_canvas, scene, position, glow=False):
+    """Paint every heart of a scene into one buffer and blit it in a single call."""
+    rgb = scene.glow_rgb(position) if glow else scene.rgb(position)
+    image = pygame.image.frombuffer(rgb, (scene.width, scene.height), "RGB")
+    render_canvas.blit(image, (0, 0))
+
+def render_solid(render_canvas, solid, elapsed, beats, glow=False):
+    """Spin the 3D heart one turn every SPIN_PERIOD seconds and paint it at the canvas's size in one blit."""
+    size = render_canvas.get_size()
+    rgb = solid.rgb(core.Viewport(*size), 2 * math.pi * elapsed / SPIN_PERIOD, beats, glow=glow)
+    render_canvas.blit(pygame.image.frombuffer(rgb, size, "RGB"), (0, 0))
+
+class StatsOverlay:
+    """Per-stage p50/p99 times in the window corner, re-rendered every `refresh` frames."""
+
+    def __init__(self, timer, refresh=15):
+        self.timer = timer
+        self.refresh = refresh
+        self.frames = 0
+        self.lines = []
+        self.font = pygame.font.Font(None, 20)
+
+    def draw(self, render_canvas):
+        if self.frames % self.refresh == 0:
+            self.lines = [self.font.render(line, True, (255, 255, 255)) for line in self.timer.summary()]
+        self.frames += 1
+        for row, line in enumerate(self.lines):
+            render_canvas.blit(line, (8, 8 + row * line.get_height()))
+
+def show_progress(done, total):
+    caption = "Beating Heart" if done == total else f"Beating Heart (building {done}/{total})"
+    pygame.display.set_caption(caption)
+
+async def run(argv=None):
+    """The game loop as a coroutine, so a host's asyncio loop keeps running while the heart beats."""
+    parser = argparse.ArgumentParser(description="Beating heart in a pygame window.")
+    parser.add_argument("--bpm", metavar="SOURCE",
+                        help="follow a live heart rate read from '-' (stdin), udp:PORT or a file")
+    parser.add_argument("--mode", choices=RENDER_MODES, default="surface", help="render mode to start in (m cycles)")
+    parser.add_argument("--hearts", type=int, metavar="N", help="tile the window with N hearts beating out of step")
+    parser.add_argument("--3d", dest="solid", action="store_true",
+                        help="draw a rotating 3D particle heart; glow mode lights it, the other modes paint it")
+    parser.add_argument("--stats", action="store_true", help="overlay per-stage p50/p99 frame timings")
+    parser.add_argument("--trace", metavar="FILE", help="write a Chrome trace of every stage to FILE on exit")
+    args = parser.parse_args(argv)
+    beat_clock = None
+    if args.bpm:
+        beat_clock = BeatClock()
+        open_bpm_source(args.bpm, beat_clock)
+    # The 3D heart turns continuously, so it refreshes as fast as a live tempo does
+    fps = LIVE_FPS if beat_clock is not None or args.solid else FPS
+
+    # Set up the window here rather than at import so worker processes stay headless
+    pygame.init()
+    screen = pygame.display.set_mode((CANVAS_WIDTH, CANVAS_HEIGHT), pygame.RESIZABLE)
+    pygame.display.set_caption("Beating Heart")
+
+    # The window opens at once: sparse previews beat while the full heart builds in the background
+    component = None
+    if args.solid:
+        # The 3D heart has no frames to build, only its particles to sample
+        startup = asyncio.get_running_loop().run_in_executor(None, SolidHeart)
+    else:
+        component = HeartComponent(Heart, generate_frame=20, seed=DEFAULT_SEED, cache=True, target_fps=fps,
+                                   on_progress=show_progress)
+        startup = asyncio.create_task(component.start())
+    render_mode = args.mode
     render_frame = 1
-
-    while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                return
-
-        screen.fill((0, 0, 0))  # Fill the screen with black
-        heart.render(screen, render_frame)
-        render_frame += 1
-
-        pygame.display.flip()  # Update the screen
-        clock.tick(20)  # 60 FPS
+    scene = None
+    if args.hearts:
+        scene = Scene(None, CANVAS_WIDTH, CANVAS_HEIGHT)
+        scene.tile(args.hearts)
+    # Timing is off unless asked for, and then each stage costs a couple of clock reads
+    timer = StageTimer(enabled=args.stats, trace=args.trace is not None)
+    overlay = StatsOverlay(timer) if args.stats else None
+    last_frame = started = time.perf_counter()
+
+    try:
+        while True:
+            with timer.stage("events"):
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        return
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+                        # Cycle through the render modes to compare them live
+                        render_mode = RENDER_MODES[(RENDER_MODES.index(render_mode) + 1) % len(RENDER_MODES)]
+                        pygame.display.set_caption(f"Beating Heart ({render_mode})")
+                    if event.type == pygame.VIDEORESIZE and scene is not None:
+                        scene.resize(event.w, event.h)
+                        scene.tile(args.hearts)
+
+            with timer.stage("fill"):
+                screen.fill((0, 0, 0))  # Fill the screen with black
+            if startup.done():
+                startup.result()  # re-raise anything that went wrong while building
+            if component is None:
+                with timer.stage("render"):
+                    if startup.done():
+                        elapsed = time.perf_counter() - started
+                        beats = beat_clock.tick() if beat_clock is not None else elapsed * DEFAULT_BPM / 60
+                        render_solid(screen, startup.result(), elapsed, beats, glow=render_mode == "glow")
+            else:
+                with timer.stage("render"):
+                    position = render_frame if beat_clock is None else beat_clock.position(component)
+                    frame = math.floor(position) % component.generate_frame
+                    # A live tempo blends each frame with the next, so both must be ready
+                    frames = (frame,) if beat_clock is None else (frame, (frame + 1) % component.generate_frame)
+                    heart = component.heart_for(*(range(component.generate_frame) if scene else frames))
+                    render_frame += 1
+                    if heart is not None:
+                        # Hearts join as they finish building, so bring each to the window's size and mode
+                        if (heart.viewport.width, heart.viewport.height) != screen.get_size():
+                            # Frames live in reference space, so a new size only needs new pixels
+                            heart.resize(*screen.get_size())
+                        heart.render_mode = render_mode
+                        if scene is not None:
+                            scene.use(heart)
+                            render_scene(screen, scene, position, glow=render_mode == "glow")
+                        elif beat_clock is None:
+                            heart.render(screen, frame)
+                        else:
+                            # A new BPM bends the phase from this frame on; the frames themselves never change
+                            heart.render_at(screen, position)
+            if overlay is not None:
+                with timer.stage("overlay"):
+                    overlay.draw(screen)
+
+            with timer.stage("flip"):
+                pygame.display.flip()  # Update the screen
+            with timer.stage("tick"):
+                # Sleep through the rest of the frame on the event loop, so startup and host tasks run
+                now = time.perf_counter()
+                await asyncio.sleep(max(0.0, last_frame + 1 / fps - now))
+            now = time.perf_counter()
+            timer.record("frame", now - last_frame)
+            last_frame = now
+    finally:
+        startup.cancel()
+        pygame.quit()
+        if args.trace:
+            timer.dump(args.trace)
+
+def main(argv=None):
+    asyncio.run(run(argv))
 
 if __name__ == "__main__":
     main()
-
-## not working 3d heart code idk how to get the exact numbers
-# import pygame
-# import random
-# import math
-
-# # Constants
-# CANVAS_WIDTH = 640
-# CANVAS_HEIGHT = 600
-# CANVAS_CENTER_X = CANVAS_WIDTH // 2
-# CANVAS_CENTER_Y = CANVAS_HEIGHT // 2
-# IMAGE_ENLARGEMENT = 11
-# HEART_COLOR = (255, 33, 33)  # RGB value for red
-
-# # Initialize Pygame
-# pygame.init()
-# screen = pygame.display.set_mode((CANVAS_WIDTH, CANVAS_HEIGHT))
-# pygame.display.set_caption("Beating Heart 3D")
-# clock = pygame.time.Clock()
-
-# def heart_function(t, shrink_ratio=IMAGE_ENLARGEMENT):
-#     x = 16 * math.sin(t)**3
-#     y = 13 * math.cos(t) - 5 * math.cos(2 * t) - 2 * math.cos(3 * t) - math.cos(4 * t)
-#     x *= shrink_ratio
-#     y *= shrink_ratio
-#     return int(x + CANVAS_CENTER_X), int(-y + CANVAS_CENTER_Y)
-
-# def scatter_inside(x, y, beta=0.035):  # Tighter scatter
-#     ratio_x = beta * math.log(random.random())
-#     ratio_y = beta * math.log(random.random())
-#     dx = ratio_x * (x - CANVAS_CENTER_X)
-#     dy = ratio_y * (y - CANVAS_CENTER_Y)
-#     return x - dx, y - dy
-
-# def shrink(x, y, ratio):
-#     force = -1 / (((x - CANVAS_CENTER_X)**2 + (y - CANVAS_CENTER_Y)**2)**0.6)
-#     dx = ratio * force * (x - CANVAS_CENTER_X)
-#     dy = ratio * force * (y - CANVAS_CENTER_Y)
-#     return x - dx, y - dy
-
-# def curve(p):
-#     return 2 * (2 * math.sin(4 * p)) / (2 * math.pi)
-
-# def distance_from_center(x, y):
-#     return math.sqrt((x - CANVAS_CENTER_X) ** 2 + (y - CANVAS_CENTER_Y) ** 2)
-
-# class Heart:
-#     def __init__(self, generate_frame=20):
-#         self.points = set()
-#         self.center_diffusion_points = set()
-#         self.inner_scattered_points = set()
-#         self.all_points = {}
-#         self.generate_frame = generate_frame
-#         self.build(2000)
-
-#         for frame in range(generate_frame):
-#             self.calc(frame)
-
-#     def build(self, number):
-#         # Outer edge points
-#         for _ in range(number):
-#             t = random.uniform(0, 2 * math.pi)
-#             x, y = heart_function(t)
-#             self.points.add((x, y))
-
-#         # Add scattered edge points
-#         for _x, _y in list(self.points):
-#             for _ in range(3):
-#                 x, y = scatter_inside(_x, _y, 0.035)  # Sharper edge scatter
-#                 self.points.add((x, y))
-
-#         # Center diffusion points
-#         point_list = list(self.points)
-#         for _ in range(4000):
-#             x, y = random.choice(point_list)
-#             x, y = scatter_inside(x, y, 0.17)
-#             self.center_diffusion_points.add((x, y))
-
-#         # Inner scattered points with distance-based density
-#         self.inner_scatter_points()
-
-#         # Extra scattered inner particles with distance based on distance
-#         for _ in range(3500):
-#             t = random.uniform(0, 2 * math.pi)
-#             base_x, base_y = heart_function(t, shrink_ratio=random.uniform(7, 10.5))
-#             base_x += random.randint(-5, 5)  # Tighter scatter
-#             base_y += random.randint(-5, 5)
-
-#             distance = distance_from_center(base_x, base_y)
-#             density_factor = 1 / (1 + distance / 100)
-
-#             if random.random() < density_factor:
-#                 self.inner_scattered_points.add((base_x, base_y))
-
-#     def inner_scatter_points(self):
-#         """Generate particles to fill the inner space of the heart and ensure it reaches the center."""
-#         for _ in range(30000):
-#             t = random.uniform(0, 2 * math.pi)
-#             base_x, base_y = heart_function(t, shrink_ratio=random.uniform(7, 10.5))
-#             base_x += random.randint(-5, 5)  # Tighter scatter
-#             base_y += random.randint(-5, 5)
-
-#             distance = distance_from_center(base_x, base_y)
-#             density_factor = 1 / (1 + (distance ** 2) / 40)
-
-#             if random.random() < density_factor:
-#                 self.inner_scattered_points.add((base_x, base_y))
-
-#     def calc_position(self, x, y, ratio):
-#         force = 1 / (((x - CANVAS_CENTER_X) ** 2 + (y - CANVAS_CENTER_Y) ** 2) ** 0.49)  # Stronger center pull
-#         dx = ratio * force * (x - CANVAS_CENTER_X) + random.randint(-1, 1)
-#         dy = ratio * force * (y - CANVAS_CENTER_Y) + random.randint(-1, 1)
-#         return x - dx, y - dy
-
-#     def calc(self, generate_frame):
-#         ratio = 10 * curve(generate_frame / 20 * math.pi)
-#         halo_radius = int(4 + 6 * (1 + curve(generate_frame / 10 * math.pi)))
-#         halo_number = int(3000 + 4000 * abs(curve(generate_frame / 10 * math.pi) ** 2))
-
-#         all_points = []
-#         heart_halo_point = set()
-
-#         # Halo glow
-#         for _ in range(halo_number):
-#             t = random.uniform(0, 2 * math.pi)
-#             x, y = heart_function(t, shrink_ratio=11.6)
-#             x, y = shrink(x, y, halo_radius)
-#             if (x, y) not in heart_halo_point:
-#                 heart_halo_point.add((x, y))
-#                 x += random.randint(-18, 18)  # Softer outer glow
-#                 y += random.randint(-18, 18)
-#                 size = random.choice((1, 2, 3))
-#                 all_points.append((x, y, size))
-
-#         # Main edge
-#         for x, y in self.points:
-#             x, y = self.calc_position(x, y, ratio)
-#             dist = distance_from_center(x, y)
-#             if dist < 50:
-#                 size = random.choice((2, 3))  # Bigger particles near center
-#             elif dist < 100:
-#                 size = random.choice((1, 2))
-#             else:
-#                 size = 1
-#             all_points.append((x, y, size))
-
-#         # Center particles
-#         for x, y in self.center_diffusion_points:
-#             x, y = self.calc_position(x, y, ratio)
-#             dist = distance_from_center(x, y)
-#             if dist < 50:
-#                 size = random.choice((2, 3))
-#             elif dist < 100:
-#                 size = random.choice((1, 2))
-#             else:
-#                 size = 1
-#             all_points.append((x, y, size))
-
-#         # Scattered inner particles
-#         for x, y in self.inner_scattered_points:
-#             x, y = self.calc_position(x, y, ratio)
-#             dist = distance_from_center(x, y)
-#             if dist < 50:
-#                 size = random.choice((2, 3))
-#             elif dist < 100:
-#                 size = random.choice((1, 2))
-#             else:
-#                 size = 1
-#             all_points.append((x, y, size))
-
-#         self.all_points[generate_frame] = all_points
-
-#     def render(self, render_canvas, render_frame):
-#         for x, y, size in self.all_points[render_frame % self.generate_frame]:
-#             pygame.draw.rect(render_canvas, HEART_COLOR, pygame.Rect(x, y, size, size))
-
-# # Main game loop
-# def main():
-#     heart = Heart(generate_frame=20)
-#     render_frame = 1
-
-#     while True:
-#         for event in pygame.event.get():
-#             if event.type == pygame.QUIT:
-#                 pygame.quit()
-#                 return
-
-#         screen.fill((0, 0, 0))  # Black background
-#         heart.render(screen, render_frame)
-#         render_frame += 1
-
-#         pygame.display.flip()
-#         clock.tick(20)
-
-# if __name__ == "__main__":
-#     main()
-# # This code creates a 3D beating heart animation using Pygame.
-# # The heart is generated using a mathematical function and is animated to give a beating effect.
\ No newline at end of file